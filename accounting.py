@@ -9,51 +9,42 @@
 import plotly.express as px
 import streamlit as st
 import pandas as pd
+import functools
+import os
+import tempfile
+import time
 import uuid
+from collections import Counter
 from datetime import datetime
+import accounting_store as store
+import accounting_analytics as analytics
+import accounting_dashboard
+import accounting_import
+import accounting_profile as profile
+import accounting_report
 
-FILE = "accounting.xlsx"
-
-# 엑셀 파일 로드
-def load_excel():
-    xls = pd.ExcelFile(FILE)
-    return {
-        "transactions": pd.read_excel(xls, "transactions"),
-        "accounts": pd.read_excel(xls, "accounts"),
-        "cards": pd.read_excel(xls, "cards"),
-        "categories": pd.read_excel(xls, "categories"),
-        "users": pd.read_excel(xls, "users"),
-    }
-
-# 엑셀 저장
-def save_excel(data):
-    with pd.ExcelWriter(FILE, engine="openpyxl") as writer:
-        for sheet, df in data.items():
-            df.to_excel(writer, sheet_name=sheet, index=False)
+script_start = time.perf_counter()
 
 # UI 시작
 st.title("📊 법인 계좌·카드 관리 시스템")
 
-data = load_excel()
+# 세션별 읽기/쓰기 횟수 집계
+io_stats = st.session_state.setdefault("io_stats", Counter())
+store.track_io(io_stats)
 
-# id 자동 생성 처리
-transactions = data["transactions"]
-# id 컬럼이 없으면 생성
-if "id" not in transactions.columns:
-    transactions["id"] = None
-# id가 비어 있는 행에 대해 UUID 자동 생성
-transactions["id"] = transactions["id"].apply(
-    lambda x: str(uuid.uuid4()) if pd.isna(x) or x == "" else x
-)
-# 다시 저장
-data["transactions"] = transactions
-save_excel(data)
+# 저장소 준비 (DB 가 없으면 accounting.xlsx 에서 최초 1회 가져오기)
+# id 자동 생성 등 마이그레이션은 세션당 한 번만 확인 (실제 적용은 DB 당 1회)
+if "migrated" not in st.session_state:
+    with profile.run("ensure_database"):
+        store.ensure_database()
+    st.session_state["migrated"] = True
 
 menu = st.sidebar.selectbox(
     "메뉴 선택",
     [
         "대시보드",
         "입력",
+        "일괄 가져오기",
         "월별 통계",
         "연도별 통계",
         "거래 관리",
@@ -64,96 +55,175 @@ menu = st.sidebar.selectbox(
     ]
 )
 
+# -------------------------
+# 엑셀 가져오기/내보내기 (교환 형식)
+# -------------------------
+with st.sidebar.expander("📁 엑셀 가져오기/내보내기"):
+    dirty = store.dirty_tables()
+    st.caption("마지막 내보내기 이후 변경: " + (", ".join(dirty) if dirty else "없음"))
+    if st.button("📤 엑셀로 내보내기"):
+        with profile.run("export_excel"):
+            exported = store.export_excel()
+        if exported:
+            st.success(f"{store.XLSX_FILE} 저장 완료!")
+        else:
+            st.info("변경 사항이 없어 저장하지 않았습니다.")
+
+    st.caption(f"가져오기는 현재 데이터를 {store.XLSX_FILE} 내용으로 교체합니다.")
+    if st.button("📥 엑셀에서 가져오기"):
+        with profile.run("import_excel"):
+            store.import_excel()
+        st.success(f"{store.XLSX_FILE} 가져오기 완료!")
+
+# -------------------------
+# 페이지 (st.fragment)
+# - 페이지 안의 위젯을 바꾸면 그 페이지 함수만 다시 실행 (사이드바, 다른 페이지는 건너뜀)
+# - 페이지마다 필요한 테이블만 load_tables() 로 가져옴 (버전이 같으면 저장소 캐시를 그대로 사용)
+# - 페이지 아래에 이번 실행 시간(단계별), 전체/페이지 실행 횟수, DB 읽기 횟수 표시
+# -------------------------
+runs = st.session_state.setdefault("runs", Counter())
+runs["전체"] += 1
+
+
+def load_tables(*tables):
+    """{테이블: DataFrame} (저장소 캐시를 복사 없이 공유하므로 수정하지 말 것)"""
+    return store.load_all(tables=tables, copy=False)
+
+
+def page_fragment(func):
+    @st.fragment
+    @functools.wraps(func)
+    def run():
+        store.track_io(io_stats)  # 페이지만 다시 실행될 때도 같은 세션 Counter 에 집계
+        reads = io_stats["read"]
+        with profile.run(func.__name__) as record:
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+        runs[func.__name__] += 1
+        stages = " · ".join(
+            f"{stage} {record[f'{stage}_ms']:.1f}" for stage in profile.STAGES if record[f"{stage}_ms"] >= 0.1
+        )
+        st.caption(
+            f"⏱ 이번 실행 {elapsed:.1f}ms" + (f" ({stages})" if stages else "") + " · "
+            f"전체 실행 {runs['전체']}회 · 이 페이지 실행 {runs[func.__name__]}회 · "
+            f"DB 읽기 {io_stats['read'] - reads}회"
+        )
+    return run
+
+
+# 차트 생성/그리기 시간은 chart 단계로 측정
+pie = profile.timed("chart")(px.pie)
+line = profile.timed("chart")(px.line)
+plotly_chart = profile.timed("chart")(st.plotly_chart)
+
+# 기간 비교 (전월 / 전년 / 최근 12개월) 기준과 표 컬럼 이름
+COMPARE_BY = {"항목": "category", "계좌": "account", "카드": "card"}
+COMPARE_LABELS = {
+    "amount": "금액", "prev_month": "전월", "mom_pct": "전월 대비",
+    "last_year": "전년 동월", "yoy_pct": "전년 대비",
+    "ttm": "최근 12개월", "prev_ttm": "직전 12개월", "ttm_pct": "12개월 증감",
+    "prev_year": "전년",
+}
+
+
+def comparison_table(df, by_label):
+    """금액은 천 단위 구분, 증감률(_pct)은 부호와 % 로 표시"""
+    df = df.copy()
+    for column in df.columns[1:]:
+        if column.endswith("_pct"):
+            df[column] = df[column].apply(lambda x: "-" if pd.isna(x) else f"{x:+.1f}%")
+        else:
+            df[column] = df[column].apply(lambda x: f"{x:,}")
+    return df.rename(columns={**COMPARE_LABELS, COMPARE_BY[by_label]: by_label})
+
+
+def comparison_section(key, compare):
+    """기준/유형 선택과 비교 표 (compare(by, type) → DataFrame)"""
+    col1, col2 = st.columns(2)
+    by_label = col1.selectbox("기준", list(COMPARE_BY), key=f"{key}_by")
+    type_ = col2.selectbox("유형", ["지출", "수입"], key=f"{key}_type")
+    comparison = compare(COMPARE_BY[by_label], type_)
+    if comparison.empty:
+        st.info(f"{type_} 데이터가 없습니다.")
+    else:
+        st.dataframe(comparison_table(comparison, by_label), hide_index=True)
+
+
+st.sidebar.caption(
+    f"세션 I/O — 읽기 {io_stats['read']} · 스냅샷 {io_stats['snapshot']} · 저널 {io_stats['replay']} · "
+    f"캐시 {io_stats['hit']} · "
+    f"쓰기 {io_stats['write']} · 건너뜀 {io_stats['skip']}"
+)
+
 # -------------------------
 # 대시보드 페이지
 # -------------------------
-if menu == "대시보드":
+@page_fragment
+def dashboard_page():
     st.header("📊 대시보드")
 
-    df = data["transactions"]
-    df["date"] = pd.to_datetime(df["date"])
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.month
+    # 🔥 모든 표/차트는 집계 큐브에서 조회
+    cube = analytics.get_cube()
 
     # 🔥 연도 선택 추가
-    years = sorted(df["year"].unique())
+    years = cube.years()
     selected_year = st.selectbox("연도 선택", years)
 
-    # 🔥 선택된 연도 데이터만 사용
-    df_year = df[df["year"] == selected_year]
-
-    import plotly.express as px
-
-    # 1) 카드별 지출 파이차트
-    st.subheader("💳 카드별 지출 비중")
-    card_expense = df_year[df_year["type"] == "지출"].groupby("card")["amount"].sum().reset_index()
-    card_expense = card_expense[card_expense["card"] != ""]
-    if not card_expense.empty:
-        fig = px.pie(card_expense, names="card", values="amount", title=f"{selected_year}년 카드별 지출 비중")
-        st.plotly_chart(fig)
-    else:
-        st.info("지출 데이터가 없습니다.")
-
-    # 2) 계좌별 수입/지출 파이차트
-    st.subheader("🏦 계좌별 수입 비중")
-    income_acc = df_year[df_year["type"] == "수입"].groupby("account")["amount"].sum().reset_index()
-    income_acc = income_acc[income_acc["account"] != ""]
-    if not income_acc.empty:
-        fig = px.pie(income_acc, names="account", values="amount",
-                    title=f"{selected_year}년 계좌별 수입 비중")
-        st.plotly_chart(fig)
-    else:
-        st.info("수입 데이터가 없습니다.")
-
-    st.subheader("🏦 계좌별 지출 비중")
-    expense_acc = df_year[df_year["type"] == "지출"].groupby("account")["amount"].sum().reset_index()
-    expense_acc = expense_acc[expense_acc["account"] != ""]
-    if not expense_acc.empty:
-        fig = px.pie(expense_acc, names="account", values="amount",
-                    title=f"{selected_year}년 계좌별 지출 비중")
-        st.plotly_chart(fig)
-    else:
-        st.info("지출 데이터가 없습니다.")
-
-    # 3) 월별 지출 추세 라인차트
-    st.subheader("📉 월별 지출 추세")
-    monthly_expense = df_year[df_year["type"] == "지출"].groupby("month")["amount"].sum().reset_index()
-    fig = px.line(monthly_expense, x="month", y="amount", markers=True,
-                  title=f"{selected_year}년 월별 지출 추세")
-    st.plotly_chart(fig)
-
-    # 4) 월별 수입 추세 라인차트
-    st.subheader("📉 월별 수입 추세")
-    monthly_expense = df_year[df_year["type"] == "수입"].groupby("month")["amount"].sum().reset_index()
-    fig = px.line(monthly_expense, x="month", y="amount", markers=True,
-                  title=f"{selected_year}년 월별 수입 추세")
-    st.plotly_chart(fig)
-
-    import io
-
-    # 5) 보고서(Excel) 다운로드
-    if st.button("📥 Excel 보고서 다운로드"):
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-            df_year.to_excel(writer, sheet_name="연도별 데이터", index=False)
-            card_expense.to_excel(writer, sheet_name="카드별 지출", index=False)
-            income_acc.to_excel(writer, sheet_name="계좌별 수입", index=False)
-            expense_acc.to_excel(writer, sheet_name="계좌별 지출", index=False)
-
-        st.download_button(
-            label="Excel 다운로드",
-            data=output.getvalue(),
-            file_name=f"report_{selected_year}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+    # 1) 카드별 지출 / 2) 계좌별 수입·지출 / 3~4) 월별 지출·수입 추세
+    #    (연도·데이터 버전별로 만든 차트를 재사용, 저장 후에는 백그라운드에서 미리 만들어 둠)
+    for panel in accounting_dashboard.get_dashboard(selected_year):
+        st.subheader(panel.subheader)
+        if panel.figure is not None:
+            plotly_chart(panel.figure)
+        else:
+            st.info(panel.message)
+
+    # 5) 보고서 다운로드 (기간 선택, 거래 행은 파일로 바로 기록)
+    st.subheader("📥 보고서 다운로드")
+    periods = cube.year_months()
+    if periods:
+        labels = [f"{y}-{m:02d}" for y, m in periods]
+        in_year = [i for i, (y, _) in enumerate(periods) if y == selected_year]
+        col1, col2, col3 = st.columns(3)
+        start_i = col1.selectbox("시작 월", range(len(periods)), index=in_year[0], format_func=labels.__getitem__)
+        end_i = col2.selectbox("종료 월", range(len(periods)), index=in_year[-1], format_func=labels.__getitem__)
+        report_format = col3.selectbox("형식", ["xlsx", "csv"])
+
+        if st.button("📥 보고서 만들기"):
+            if start_i > end_i:
+                st.error("시작 월이 종료 월보다 늦습니다.")
+            else:
+                write_report = {
+                    "xlsx": accounting_report.write_excel_report,
+                    "csv": accounting_report.write_csv_report,
+                }[report_format]
+                with tempfile.TemporaryDirectory() as tmp:
+                    path = os.path.join(tmp, f"report.{report_format}")
+                    count = write_report(path, periods[start_i], periods[end_i])
+                    with open(path, "rb") as f:
+                        payload = f.read()
+
+                st.download_button(
+                    label=f"{report_format.upper()} 다운로드 ({count:,}건)",
+                    data=payload,
+                    file_name=f"report_{labels[start_i]}_{labels[end_i]}.{report_format}",
+                    mime={
+                        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        "csv": "text/csv",
+                    }[report_format]
+                )
 
 
 # -------------------------
 # 입력 페이지
 # -------------------------
-elif menu == "입력":
+@page_fragment
+def input_page():
     st.header("📥 거래 입력")
 
+    data = load_tables("accounts", "cards", "categories", "users")
+
     date = st.date_input("날짜")
     type_ = st.selectbox("유형", ["지출", "수입"])
     amount = st.number_input("금액", min_value=0)
@@ -181,49 +251,94 @@ elif menu == "입력":
             "created_at": datetime.now()
         }
 
-        df = data["transactions"]
-        df.loc[len(df)] = new_row
-        data["transactions"] = df
-
-        save_excel(data)
+        store.insert_row("transactions", new_row)
         st.success("저장 완료!")
 
+# -------------------------
+# 일괄 가져오기 (은행/카드 거래내역)
+# -------------------------
+@page_fragment
+def import_page():
+    st.header("📦 거래내역 일괄 가져오기")
+
+    data = load_tables("users")
+
+    uploaded = st.file_uploader("거래내역 파일 (CSV, xlsx)", type=["csv", "xlsx"])
+
+    if uploaded is not None:
+        columns = accounting_import.read_header(uploaded)
+        guessed = accounting_import.guess_mapping(columns)
+
+        # 파일 컬럼 ↔ 거래 컬럼 연결
+        st.subheader("🔗 컬럼 연결")
+        field_labels = {
+            "date": "날짜", "type": "유형", "amount": "금액", "account": "계좌",
+            "card": "카드", "category": "항목", "memo": "메모",
+        }
+        options = ["(없음)"] + columns
+        mapping = {}
+        for f, label in field_labels.items():
+            default = options.index(guessed[f]) if guessed[f] else 0
+            col = st.selectbox(label, options, index=default, key=f"import_{f}")
+            mapping[f] = None if col == "(없음)" else col
+
+        type_choice = st.selectbox(
+            "유형 컬럼이 없을 때", ["금액 부호로 판단 (음수 = 지출)", "모두 지출", "모두 수입"]
+        )
+        default_type = {"모두 지출": "지출", "모두 수입": "수입"}.get(type_choice)
+        created_by = st.selectbox("입력자", list(data["users"]["name"]))
+
+        if st.button("가져오기"):
+            status = st.empty()
+            try:
+                result = accounting_import.import_statement(
+                    uploaded, mapping, created_by, default_type,
+                    progress=lambda n: status.text(f"{n:,}행 읽는 중..."),
+                )
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                status.empty()
+                st.success(
+                    f"전체 {result.total:,}행 중 {result.inserted:,}건 추가, "
+                    f"중복 {result.duplicates:,}건, 오류 {len(result.errors):,}건"
+                )
+                if result.errors:
+                    st.subheader("⚠️ 오류 행")
+                    st.dataframe(pd.DataFrame(result.errors[:1000], columns=["행", "사유"]))
+
 # -------------------------
 # 월별 통계
 # -------------------------
-elif menu == "월별 통계":
+@page_fragment
+def monthly_page():
     st.header("📅 월별 통계")
 
-    df = data["transactions"]
-    if df.empty:
+    cube = analytics.get_cube()
+    if not cube.years():
         st.info("데이터가 없습니다.")
     else:
-        df["date"] = pd.to_datetime(df["date"])
-        df["year"] = df["date"].dt.year
-        df["month"] = df["date"].dt.month
-
-        year = st.selectbox("연도 선택", sorted(df["year"].unique()))
-        month = st.selectbox("월 선택", sorted(df[df["year"] == year]["month"].unique()))
+        year = st.selectbox("연도 선택", cube.years())
+        month = st.selectbox("월 선택", cube.months(year))
 
-        filtered = df[(df["year"] == year) & (df["month"] == month)]
+        period = {"year": year, "month": month}
 
         # -------------------------
         # 🔥 지출 통계
         # -------------------------
         st.subheader("💸 지출 통계")
 
-        expense = filtered[filtered["type"] == "지출"]
-        if not expense.empty:
-            exp_sum = expense.groupby("category")["amount"].sum().reset_index()
+        exp_by_category = cube.sum_by("category", type="지출", **period)
+        if not exp_by_category.empty:
+            exp_sum = exp_by_category.copy()
             exp_sum["amount"] = exp_sum["amount"].apply(lambda x: f"{x:,}")
             st.table(exp_sum)
 
             # 파이차트
-            import plotly.express as px
-            fig_exp = px.pie(expense.groupby("category")["amount"].sum().reset_index(),
-                             names="category", values="amount",
-                             title="지출 항목 비중")
-            st.plotly_chart(fig_exp)
+            fig_exp = pie(exp_by_category,
+                          names="category", values="amount",
+                          title="지출 항목 비중")
+            plotly_chart(fig_exp)
         else:
             st.info("지출 데이터가 없습니다.")
 
@@ -232,16 +347,16 @@ elif menu == "월별 통계":
         # -------------------------
         st.subheader("💰 수입 통계")
 
-        income = filtered[filtered["type"] == "수입"]
-        if not income.empty:
-            inc_sum = income.groupby("category")["amount"].sum().reset_index()
+        inc_by_category = cube.sum_by("category", type="수입", **period)
+        if not inc_by_category.empty:
+            inc_sum = inc_by_category.copy()
             inc_sum["amount"] = inc_sum["amount"].apply(lambda x: f"{x:,}")
             st.table(inc_sum)
 
-            fig_inc = px.pie(income.groupby("category")["amount"].sum().reset_index(),
-                             names="category", values="amount",
-                             title="수입 항목 비중")
-            st.plotly_chart(fig_inc)
+            fig_inc = pie(inc_by_category,
+                          names="category", values="amount",
+                          title="수입 항목 비중")
+            plotly_chart(fig_inc)
         else:
             st.info("수입 데이터가 없습니다.")
         
@@ -249,11 +364,10 @@ elif menu == "월별 통계":
         # 🔥 카드별 지출
         # -------------------------
         st.subheader("💳 카드별 지출 비중")
-        card_expense = filtered[filtered["type"] == "지출"].groupby("card")["amount"].sum().reset_index()
-        card_expense = card_expense[card_expense["card"] != ""]
+        card_expense = cube.sum_by("card", type="지출", **period)
         if not card_expense.empty:
-            fig = px.pie(card_expense, names="card", values="amount", title="카드별 지출 비중")
-            st.plotly_chart(fig)
+            fig = pie(card_expense, names="card", values="amount", title="카드별 지출 비중")
+            plotly_chart(fig)
         else:
             st.info("지출 데이터가 없습니다.")
 
@@ -261,22 +375,20 @@ elif menu == "월별 통계":
         # 🔥 계좌별 수입/지출
         # -------------------------
         st.subheader("🏦 계좌별 수입 비중")
-        income_acc = filtered[filtered["type"] == "수입"].groupby("account")["amount"].sum().reset_index()
-        income_acc = income_acc[income_acc["account"] != ""]
+        income_acc = cube.sum_by("account", type="수입", **period)
         if not income_acc.empty:
-            fig = px.pie(income_acc, names="account", values="amount",
-                        title="계좌별 수입 비중")
-            st.plotly_chart(fig)
+            fig = pie(income_acc, names="account", values="amount",
+                     title="계좌별 수입 비중")
+            plotly_chart(fig)
         else:
             st.info("수입 데이터가 없습니다.")
 
         st.subheader("🏦 계좌별 지출 비중")
-        expense_acc = filtered[filtered["type"] == "지출"].groupby("account")["amount"].sum().reset_index()
-        expense_acc = expense_acc[expense_acc["account"] != ""]
+        expense_acc = cube.sum_by("account", type="지출", **period)
         if not expense_acc.empty:
-            fig = px.pie(expense_acc, names="account", values="amount",
-                        title="계좌별 지출 비중")
-            st.plotly_chart(fig)
+            fig = pie(expense_acc, names="account", values="amount",
+                     title="계좌별 지출 비중")
+            plotly_chart(fig)
         else:
             st.info("지출 데이터가 없습니다.")
 
@@ -285,8 +397,8 @@ elif menu == "월별 통계":
         # -------------------------
         st.subheader("📘 월별 자동 결산")
 
-        total_income = filtered[filtered["type"] == "수입"]["amount"].sum()
-        total_expense = filtered[filtered["type"] == "지출"]["amount"].sum()
+        total_income = cube.total(type="수입", **period)
+        total_expense = cube.total(type="지출", **period)
         balance = total_income - total_expense
 
         summary_df = pd.DataFrame({
@@ -298,38 +410,46 @@ elif menu == "월별 통계":
 
         st.table(summary_df)
 
+        # -------------------------
+        # 🔥 기간 비교 (월 금액 배열에서 조회, 거래를 다시 읽지 않음)
+        # -------------------------
+        st.subheader("📈 전월 · 전년 동월 · 최근 12개월 비교")
+        periods = analytics.get_periods()
+        comparison_section(
+            "monthly_compare",
+            lambda by, type_: periods.compare_month(by, year, month, type=type_),
+        )
+
 # -------------------------
 # 연도별 통계
 # -------------------------
-elif menu == "연도별 통계":
+@page_fragment
+def yearly_page():
     st.header("📆 연도별 통계")
 
-    df = data["transactions"]
-    if df.empty:
+    cube = analytics.get_cube()
+    if not cube.years():
         st.info("데이터가 없습니다.")
     else:
-        df["date"] = pd.to_datetime(df["date"])
-        df["year"] = df["date"].dt.year
+        year = st.selectbox("연도 선택", cube.years())
 
-        year = st.selectbox("연도 선택", sorted(df["year"].unique()))
-        filtered = df[df["year"] == year]
+        period = {"year": year}
 
         # -------------------------
         # 🔥 지출 통계
         # -------------------------
         st.subheader("💸 지출 통계")
 
-        expense = filtered[filtered["type"] == "지출"]
-        if not expense.empty:
-            exp_sum = expense.groupby("category")["amount"].sum().reset_index()
+        exp_by_category = cube.sum_by("category", type="지출", **period)
+        if not exp_by_category.empty:
+            exp_sum = exp_by_category.copy()
             exp_sum["amount"] = exp_sum["amount"].apply(lambda x: f"{x:,}")
             st.table(exp_sum)
 
-            import plotly.express as px
-            fig_exp = px.pie(expense.groupby("category")["amount"].sum().reset_index(),
-                             names="category", values="amount",
-                             title="지출 항목 비중")
-            st.plotly_chart(fig_exp)
+            fig_exp = pie(exp_by_category,
+                          names="category", values="amount",
+                          title="지출 항목 비중")
+            plotly_chart(fig_exp)
         else:
             st.info("지출 데이터가 없습니다.")
 
@@ -338,16 +458,16 @@ elif menu == "연도별 통계":
         # -------------------------
         st.subheader("💰 수입 통계")
 
-        income = filtered[filtered["type"] == "수입"]
-        if not income.empty:
-            inc_sum = income.groupby("category")["amount"].sum().reset_index()
+        inc_by_category = cube.sum_by("category", type="수입", **period)
+        if not inc_by_category.empty:
+            inc_sum = inc_by_category.copy()
             inc_sum["amount"] = inc_sum["amount"].apply(lambda x: f"{x:,}")
             st.table(inc_sum)
 
-            fig_inc = px.pie(income.groupby("category")["amount"].sum().reset_index(),
-                             names="category", values="amount",
-                             title="수입 항목 비중")
-            st.plotly_chart(fig_inc)
+            fig_inc = pie(inc_by_category,
+                          names="category", values="amount",
+                          title="수입 항목 비중")
+            plotly_chart(fig_inc)
         else:
             st.info("수입 데이터가 없습니다.")
 
@@ -355,11 +475,10 @@ elif menu == "연도별 통계":
         # 🔥 카드별 지출
         # -------------------------
         st.subheader("💳 카드별 지출 비중")
-        card_expense = filtered[filtered["type"] == "지출"].groupby("card")["amount"].sum().reset_index()
-        card_expense = card_expense[card_expense["card"] != ""]
+        card_expense = cube.sum_by("card", type="지출", **period)
         if not card_expense.empty:
-            fig = px.pie(card_expense, names="card", values="amount", title="카드별 지출 비중")
-            st.plotly_chart(fig)
+            fig = pie(card_expense, names="card", values="amount", title="카드별 지출 비중")
+            plotly_chart(fig)
         else:
             st.info("지출 데이터가 없습니다.")
 
@@ -367,78 +486,122 @@ elif menu == "연도별 통계":
         # 🔥 계좌별 수입/지출
         # -------------------------
         st.subheader("🏦 계좌별 수입 비중")
-        income_acc = filtered[filtered["type"] == "수입"].groupby("account")["amount"].sum().reset_index()
-        income_acc = income_acc[income_acc["account"] != ""]
+        income_acc = cube.sum_by("account", type="수입", **period)
         if not income_acc.empty:
-            fig = px.pie(income_acc, names="account", values="amount",
-                        title="계좌별 수입 비중")
-            st.plotly_chart(fig)
+            fig = pie(income_acc, names="account", values="amount",
+                     title="계좌별 수입 비중")
+            plotly_chart(fig)
         else:
             st.info("수입 데이터가 없습니다.")
 
         st.subheader("🏦 계좌별 지출 비중")
-        expense_acc = filtered[filtered["type"] == "지출"].groupby("account")["amount"].sum().reset_index()
-        expense_acc = expense_acc[expense_acc["account"] != ""]
+        expense_acc = cube.sum_by("account", type="지출", **period)
         if not expense_acc.empty:
-            fig = px.pie(expense_acc, names="account", values="amount",
-                        title="계좌별 지출 비중")
-            st.plotly_chart(fig)
+            fig = pie(expense_acc, names="account", values="amount",
+                     title="계좌별 지출 비중")
+            plotly_chart(fig)
         else:
             st.info("지출 데이터가 없습니다.")
 
+        # -------------------------
+        # 🔥 전년 비교
+        # -------------------------
+        st.subheader("📈 전년 비교")
+        periods = analytics.get_periods()
+        comparison_section(
+            "yearly_compare",
+            lambda by, type_: periods.compare_year(by, year, type=type_),
+        )
+
 # -------------------------
 # 거래 관리
 # -------------------------
-elif menu == "거래 관리":
+@page_fragment
+def transactions_page():
     st.header("🔍 검색 및 필터")
 
-    df = data["transactions"].copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df["year"] = df["date"].dt.year
-    df["month"] = df["date"].dt.month
+    data = load_tables("accounts", "cards", "categories", "users")
+
+    # 메모 검색 결과(행 위치)가 이 DataFrame 과 같은 버전인지 확인하도록 버전과 함께 읽기
+    version, df = store.load_versioned("transactions", copy=False)
+    cube = analytics.get_cube()
 
     # -----------------------------
     # 1) 연도 선택
     # -----------------------------
-    years = ["전체"] + sorted(df["year"].unique().tolist())
+    years = ["전체"] + cube.years()
     selected_year = st.selectbox("연도 선택", years)
 
+    year, month = None, None
     if selected_year != "전체":
-        df = df[df["year"] == selected_year]
+        year = selected_year
 
         # -----------------------------
         # 2) 월 선택
         # -----------------------------
-        months = ["전체"] + sorted(df["month"].unique().tolist())
+        months = ["전체"] + cube.months(selected_year)
         selected_month = st.selectbox("월 선택", months)
 
         if selected_month != "전체":
-            df = df[df["month"] == selected_month]
+            month = selected_month
 
     # -----------------------------
     # 3) 키워드 검색
     # -----------------------------
-    keyword = st.text_input("키워드 검색 (메모)")
-    if keyword:
-        df = df[df["memo"].str.contains(keyword, na=False)]
+    keyword = st.text_input("키워드 검색 (메모)", help="여러 단어는 모두 포함(AND), 단어 끝에 *를 붙이면 앞부분 일치")
+    matched = analytics.search_memos(df, version, keyword) if keyword else None
+
+    positions = analytics.filter_transactions(df, year, month, matched)
 
     # -----------------------------
-    # 4) 거래 목록 표시
+    # 4) 거래 목록 표시 (현재 페이지만 정렬/서식 적용)
     # -----------------------------
-    df_display = df.copy()
-    df_display["amount"] = df_display["amount"].apply(lambda x: f"{x:,}")
-
     st.subheader("📄 거래 목록")
+
+    sort_options = {"날짜": "date", "금액": "amount", "입력일시": "created_at"}
+    col1, col2, col3, col4 = st.columns(4)
+    sort_label = col1.selectbox("정렬 기준", list(sort_options))
+    ascending = col2.selectbox("정렬 순서", ["내림차순", "오름차순"]) == "오름차순"
+    page_size = col3.selectbox("페이지당 행 수", [20, 50, 100, 200], index=1)
+    total_pages = max(1, -(-len(positions) // page_size))
+    page = col4.number_input("페이지", min_value=1, max_value=total_pages, value=1)
+
+    page_df = analytics.page_transactions(
+        df, positions, sort_options[sort_label], ascending, page - 1, page_size
+    )
+    st.caption(f"총 {len(positions):,}건 · {page}/{total_pages} 페이지")
+
+    df_display = store.exchange_frame("transactions", page_df)
+    df_display["amount"] = df_display["amount"].apply(lambda x: f"{x:,}")
     st.dataframe(df_display)
 
+    transaction_form(df, page_df, data)
+
+
+# 수정/삭제 폼은 따로 다시 실행 (입력 칸을 바꿀 때 목록 필터/정렬을 다시 하지 않음)
+@st.fragment
+def transaction_form(df, page_df, data):
+    # 저장/삭제 후에는 목록까지 새로 그리도록 앱 전체를 다시 실행하고 결과는 여기서 표시
+    message = st.session_state.pop("transaction_message", None)
+    if message:
+        st.success(message)
+
     # -----------------------------
     # 5) 거래 선택
     # -----------------------------
     st.subheader("📝 거래 선택")
 
-    if not df.empty:
-        selected_id = st.selectbox("수정 또는 삭제할 거래 선택 (ID)", df["id"])
-        selected = df[df["id"] == selected_id].iloc[0]
+    # 찾기 입력이 없으면 현재 페이지의 거래 중에서 선택
+    lookup = st.text_input("거래 찾기 (ID 앞부분, 날짜 YYYY-MM-DD 또는 금액)")
+    candidates = analytics.lookup_transactions(df, lookup) if lookup else page_df
+
+    if not candidates.empty:
+        labels = {
+            row["id"]: f"{str(row['date'])[:10]} | {row['type']} | {row['amount']:,} | {row['memo']} | {row['id']}"
+            for _, row in candidates.iterrows()
+        }
+        selected_id = st.selectbox("수정 또는 삭제할 거래 선택", list(labels), format_func=labels.get)
+        selected = candidates[candidates["id"] == selected_id].iloc[0]
 
         st.subheader("✏️ 선택된 거래 수정")
 
@@ -463,50 +626,62 @@ elif menu == "거래 관리":
         # -----------------------------
         # 6) 수정 저장
         # -----------------------------
+        # 선택할 때 읽은 행 버전과 다르면 (다른 사용자가 먼저 수정/삭제) 저장하지 않음
         if st.button("💾 수정 저장"):
-            df_all = data["transactions"]
-            df_all.loc[df_all["id"] == selected_id, ["date", "type", "amount", "account", "card", "category", "memo", "created_by"]] = [
-                date, type_, amount, account, card, category, memo, created_by
-            ]
-            data["transactions"] = df_all
-            save_excel(data)
-            st.success("수정 완료!")
+            try:
+                store.update_row("transactions", selected_id, dict(zip(
+                    ["date", "type", "amount", "account", "card", "category", "memo", "created_by"],
+                    [date, type_, amount, account, card, category, memo, created_by]
+                )), expected_rev=int(selected[store.REV_COLUMN]))
+            except store.ConflictError as e:
+                st.error(f"{e}\n\n목록을 새로 불러온 뒤 다시 수정해 주세요.")
+            else:
+                st.session_state["transaction_message"] = "수정 완료!"
+                st.rerun()
 
         # -----------------------------
         # 7) 삭제
         # -----------------------------
         st.subheader("🗑️ 거래 삭제")
         if st.button("❌ 이 거래 삭제"):
-            df_all = data["transactions"]
-            df_all = df_all[df_all["id"] != selected_id]
-            data["transactions"] = df_all
-            save_excel(data)
-            st.success("삭제 완료!")
+            try:
+                store.delete_row("transactions", selected_id, expected_rev=int(selected[store.REV_COLUMN]))
+            except store.ConflictError as e:
+                st.error(f"{e}\n\n목록을 새로 불러온 뒤 다시 시도해 주세요.")
+            else:
+                st.session_state["transaction_message"] = "삭제 완료!"
+                st.rerun()
 
 # -------------------------
 # 계좌 관리
 # -------------------------
-elif menu == "계좌 관리":
+@page_fragment
+def accounts_page():
     st.header("🏦 계좌 관리")
 
-    # 🔥 계좌 잔액 계산
-    df = data["transactions"]
-    balances = []
+    data = load_tables("accounts")
 
-    for _, row in data["accounts"].iterrows():
-        acc = row["account_name"]
-        income = df[(df["account"] == acc) & (df["type"] == "수입")]["amount"].sum()
-        expense = df[(df["account"] == acc) & (df["type"] == "지출")]["amount"].sum()
-        balance = income - expense
-        balances.append(balance)
+    # 🔥 계좌 잔액 (잔액 원장에서 조회)
+    ledger = analytics.get_ledger()
 
     accounts_display = data["accounts"].copy()
-    accounts_display["잔액"] = balances
+    accounts_display["잔액"] = [ledger.balance(acc) for acc in accounts_display["account_name"]]
     accounts_display["잔액"] = accounts_display["잔액"].apply(lambda x: f"{x:,}")
 
     st.subheader("계좌 목록 및 잔액")
     st.table(accounts_display)
 
+    # 🔥 잔액 추이
+    st.subheader("📈 잔액 추이")
+    history_account = st.selectbox("계좌 선택", list(data["accounts"]["account_name"]))
+    history = ledger.history(history_account)
+    if not history.empty:
+        fig = line(history, x="date", y="balance", markers=True,
+                   title=f"{history_account} 잔액 추이")
+        plotly_chart(fig)
+    else:
+        st.info("거래 데이터가 없습니다.")
+
     st.subheader("계좌 추가")
     name = st.text_input("계좌명")
     bank = st.text_input("은행명")
@@ -514,27 +689,24 @@ elif menu == "계좌 관리":
     memo = st.text_input("메모")
 
     if st.button("계좌 추가"):
-        df = data["accounts"]
-        df.loc[len(df)] = [name, bank, number, memo]
-        data["accounts"] = df
-        save_excel(data)
+        store.insert_row("accounts", dict(zip(data["accounts"].columns, [name, bank, number, memo])))
         st.success("추가 완료!")
 
     st.subheader("계좌 삭제")
     delete_target = st.selectbox("삭제할 계좌", list(data["accounts"]["account_name"]))
     if st.button("삭제"):
-        df = data["accounts"]
-        df = df[df["account_name"] != delete_target]
-        data["accounts"] = df
-        save_excel(data)
+        store.delete_row("accounts", delete_target)
         st.success("삭제 완료!")
 
 # -------------------------
 # 카드 관리
 # -------------------------
-elif menu == "카드 관리":
+@page_fragment
+def cards_page():
     st.header("💳 카드 관리")
 
+    data = load_tables("cards", "accounts")
+
     st.subheader("카드 목록")
     st.write(data["cards"])
 
@@ -545,27 +717,24 @@ elif menu == "카드 관리":
     memo = st.text_input("메모")
 
     if st.button("카드 추가"):
-        df = data["cards"]
-        df.loc[len(df)] = [name, issuer, linked, memo]
-        data["cards"] = df
-        save_excel(data)
+        store.insert_row("cards", dict(zip(data["cards"].columns, [name, issuer, linked, memo])))
         st.success("추가 완료!")
 
     st.subheader("카드 삭제")
     delete_target = st.selectbox("삭제할 카드", list(data["cards"]["card_name"]))
     if st.button("삭제"):
-        df = data["cards"]
-        df = df[df["card_name"] != delete_target]
-        data["cards"] = df
-        save_excel(data)
+        store.delete_row("cards", delete_target)
         st.success("삭제 완료!")
 
 # -------------------------
 # 항목 관리
 # -------------------------
-elif menu == "항목 관리":
+@page_fragment
+def categories_page():
     st.header("📂 항목 관리")
 
+    data = load_tables("categories")
+
     st.subheader("항목 목록")
     st.write(data["categories"])
 
@@ -575,27 +744,24 @@ elif menu == "항목 관리":
     desc = st.text_input("설명")
 
     if st.button("항목 추가"):
-        df = data["categories"]
-        df.loc[len(df)] = [name, type_, desc]
-        data["categories"] = df
-        save_excel(data)
+        store.insert_row("categories", dict(zip(data["categories"].columns, [name, type_, desc])))
         st.success("추가 완료!")
 
     st.subheader("항목 삭제")
     delete_target = st.selectbox("삭제할 항목", list(data["categories"]["category_name"]))
     if st.button("삭제"):
-        df = data["categories"]
-        df = df[df["category_name"] != delete_target]
-        data["categories"] = df
-        save_excel(data)
+        store.delete_row("categories", delete_target)
         st.success("삭제 완료!")
 
 # -------------------------
 # 사용자 관리
 # -------------------------
-elif menu == "사용자 관리":
+@page_fragment
+def users_page():
     st.header("👤 사용자 관리")
 
+    data = load_tables("users")
+
     st.subheader("사용자 목록")
     st.write(data["users"])
 
@@ -604,21 +770,46 @@ elif menu == "사용자 관리":
     role = st.text_input("역할")
 
     if st.button("사용자 추가"):
-        df = data["users"]
-        df.loc[len(df)] = [str(uuid.uuid4()), name, role]
-        data["users"] = df
-        save_excel(data)
+        store.insert_row("users", dict(zip(data["users"].columns, [str(uuid.uuid4()), name, role])))
         st.success("추가 완료!")
 
     st.subheader("사용자 삭제")
     delete_target = st.selectbox("삭제할 사용자", list(data["users"]["name"]))
     if st.button("삭제"):
-        df = data["users"]
-        df = df[df["name"] != delete_target]
-        data["users"] = df
-        save_excel(data)
+        store.delete_row("users", delete_target)
         st.success("삭제 완료!")
 
+    st.subheader("🧾 최근 변경 기록")
+    st.dataframe(store.recent_changes(), hide_index=True)
+
+PAGES = {
+    "대시보드": dashboard_page,
+    "입력": input_page,
+    "일괄 가져오기": import_page,
+    "월별 통계": monthly_page,
+    "연도별 통계": yearly_page,
+    "거래 관리": transactions_page,
+    "계좌 관리": accounts_page,
+    "카드 관리": cards_page,
+    "항목 관리": categories_page,
+    "사용자 관리": users_page,
+}
+PAGES[menu]()
+
+st.sidebar.caption(f"⏱ 전체 실행 {(time.perf_counter() - script_start) * 1000:.0f}ms")
+
+# -------------------------
+# 처리 시간 기록 (관리자용, 주소에 ?admin=1 을 붙이면 표시)
+# -------------------------
+if st.query_params.get("admin") == "1":
+    with st.sidebar.expander("🛠 처리 시간 기록"):
+        st.caption(f"최근 {profile.HISTORY_SIZE}회 실행의 단계별 시간 (ms)")
+        st.dataframe(profile.summary(), hide_index=True)
+        st.dataframe(profile.history().tail(20).iloc[::-1], hide_index=True)
+        st.download_button("CSV 내려받기", profile.history_csv(), "accounting_profile.csv", "text/csv")
+        if st.button("기록 지우기"):
+            profile.clear()
+
 # -------------------------
 # 실행 방법은 페이지 상단 참조
 # -------------------------
\ No newline at end of file
@@ -0,0 +1,736 @@
+# accounting_analytics.py
+# -------------------------
+# accounting.py 집계
+# - (연, 월, 유형, 항목, 계좌, 카드) 별 금액 합계 큐브를 한 번에 만들고
+#   대시보드/월별 통계/연도별 통계의 모든 표와 차트를 큐브에서 조회
+# - 계좌별 잔액과 일자별 잔액 추이 (잔액 원장)
+# - 항목/계좌/카드별 월 금액 배열 (전월·전년 동월·최근 12개월 비교)
+# - 메모 키워드 검색용 역색인 (문자 n-gram)
+# - 거래 목록 페이지 단위 조회 (필터/정렬/서식은 보이는 페이지에만)
+# - 거래 입력/수정/삭제 시 큐브/원장을 다시 만들지 않고 해당 셀만 갱신
+# -------------------------
+
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+import accounting_profile as profile
+import accounting_store as store
+
+DIMENSIONS = ["year", "month", "type", "category", "account", "card"]
+
+
+# 잔액 계산 시 유형별 부호
+SIGNS = {"수입": 1, "지출": -1}
+
+
+def _text(value):
+    return "" if value is None or pd.isna(value) else str(value)
+
+
+def _amount(value):
+    return 0 if value is None or pd.isna(value) else int(value)
+
+
+def signed_amounts(transactions):
+    """수입은 +, 지출은 -, 그 외 유형은 0 인 금액 Series (유형별 부호는 category 코드로 조회)"""
+    types = transactions["type"].astype("category")
+    signs = np.array([SIGNS.get(t, 0) for t in types.cat.categories] + [0], dtype="int64")
+    return transactions["amount"] * signs[types.cat.codes.to_numpy()]  # 코드 -1(빈 값)은 마지막 0
+
+
+def account_balances(transactions):
+    """계좌별 잔액 Series (한 번의 groupby)"""
+    signed = signed_amounts(transactions)
+    return signed.groupby(transactions["account"], observed=True).sum()
+
+
+class AggregateCube:
+    """(year, month, type, category, account, card) → [금액 합계, 거래 수]"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.cells = {}
+        self._frame = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    @profile.timed("aggregate")
+    def from_transactions(cls, transactions, version=None):
+        """거래 DataFrame(store.compact_transactions 형태)에서 한 번의 groupby 로 큐브 생성"""
+        cube = cls(version)
+        if transactions.empty:
+            return cube
+        keys = transactions.loc[transactions["year"] > 0, DIMENSIONS + ["amount"]]
+        grouped = keys.groupby(DIMENSIONS, observed=True)["amount"].agg(["sum", "count"])
+        for key, amount, count in zip(grouped.index, grouped["sum"], grouped["count"]):
+            year, month, *rest = key
+            cube.cells[(int(year), int(month), *rest)] = [int(amount), int(count)]
+        return cube
+
+    # -------------------------
+    # 증분 갱신
+    # -------------------------
+    @staticmethod
+    def _key(row):
+        date = pd.to_datetime(row.get("date"), errors="coerce")
+        if pd.isna(date):
+            return None
+        return (date.year, date.month, _text(row.get("type")), _text(row.get("category")),
+                _text(row.get("account")), _text(row.get("card")))
+
+    def _apply(self, row, sign):
+        key = self._key(row)
+        if key is None:
+            return
+        amount = _amount(row.get("amount"))
+        with self._lock:
+            cell = self.cells.setdefault(key, [0, 0])
+            cell[0] += sign * amount
+            cell[1] += sign
+            if cell[1] == 0:
+                del self.cells[key]
+            self._frame = None
+
+    def add(self, row):
+        self._apply(row, 1)
+
+    def remove(self, row):
+        self._apply(row, -1)
+
+    # -------------------------
+    # 조회
+    # -------------------------
+    def frame(self):
+        """큐브 셀 DataFrame (거래 수보다 훨씬 작음, 변경 전까지 재사용)"""
+        with self._lock:
+            if self._frame is None:
+                self._frame = pd.DataFrame(
+                    [(*key, amount, count) for key, (amount, count) in self.cells.items()],
+                    columns=DIMENSIONS + ["amount", "count"],
+                )
+            return self._frame
+
+    def _filter(self, filters):
+        df = self.frame()
+        for dim, value in filters.items():
+            df = df[df[dim] == value]
+        return df
+
+    def years(self):
+        return sorted(self.frame()["year"].unique().tolist())
+
+    def months(self, year):
+        return sorted(self._filter({"year": year})["month"].unique().tolist())
+
+    def year_months(self):
+        """데이터가 있는 (연, 월) 목록"""
+        df = self.frame()[["year", "month"]].drop_duplicates().sort_values(["year", "month"])
+        return list(zip(df["year"].tolist(), df["month"].tolist()))
+
+    @profile.timed("aggregate")
+    def sum_by(self, by, **filters):
+        """by 별 합계 DataFrame [by, amount] (빈 값("")은 제외)"""
+        df = self._filter(filters)
+        if by not in ("year", "month"):
+            df = df[df[by] != ""]
+        return df.groupby(by)["amount"].sum().reset_index()
+
+    @profile.timed("aggregate")
+    def total(self, **filters):
+        return int(self._filter(filters)["amount"].sum())
+
+    @profile.timed("aggregate")
+    def sum_by_months(self, by, start, end, **filters):
+        """(연, 월) start ~ end (양 끝 포함) 기간의 by 별 합계"""
+        df = self._filter(filters)
+        months = df["year"] * 12 + df["month"]
+        df = df[(months >= start[0] * 12 + start[1]) & (months <= end[0] * 12 + end[1])]
+        if by not in ("year", "month"):
+            df = df[df[by] != ""]
+        return df.groupby(by)["amount"].sum().reset_index()
+
+
+class BalanceLedger:
+    """계좌별 잔액과 (계좌, 일자) → [증감 합계, 거래 수] 원장"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.balances = {}
+        self.daily = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    @profile.timed("aggregate")
+    def from_transactions(cls, transactions, version=None):
+        """거래 DataFrame(store.compact_transactions 형태)에서 잔액과 일자별 증감을 한 번의 groupby 로 생성"""
+        ledger = cls(version)
+        if transactions.empty:
+            return ledger
+        accounts = transactions["account"]
+        signed = signed_amounts(transactions)
+        ledger.balances = {
+            acc: int(amount) for acc, amount in signed.groupby(accounts, observed=True).sum().items() if acc != ""
+        }
+        dates = transactions["date"].dt.normalize()
+        keys = pd.DataFrame({"account": accounts, "date": dates, "amount": signed})
+        keys = keys[(keys["account"] != "") & dates.notna()]
+        grouped = keys.groupby(["account", "date"], observed=True)["amount"].agg(["sum", "count"])
+        for key, amount, count in zip(grouped.index, grouped["sum"], grouped["count"]):
+            ledger.daily[key] = [int(amount), int(count)]
+        return ledger
+
+    def _apply(self, row, sign):
+        account = _text(row.get("account"))
+        if account == "":
+            return
+        delta = sign * SIGNS.get(_text(row.get("type")), 0) * _amount(row.get("amount"))
+        date = pd.to_datetime(row.get("date"), errors="coerce")
+        with self._lock:
+            self.balances[account] = self.balances.get(account, 0) + delta
+            if pd.isna(date):
+                return
+            key = (account, date.normalize())
+            cell = self.daily.setdefault(key, [0, 0])
+            cell[0] += delta
+            cell[1] += sign
+            if cell[1] == 0:
+                del self.daily[key]
+
+    def add(self, row):
+        self._apply(row, 1)
+
+    def remove(self, row):
+        self._apply(row, -1)
+
+    def balance(self, account):
+        return self.balances.get(account, 0)
+
+    @profile.timed("aggregate")
+    def history(self, account):
+        """일자별 잔액 추이 DataFrame [date, change, balance]"""
+        with self._lock:
+            rows = sorted((date, amount) for (acc, date), (amount, _) in self.daily.items() if acc == account)
+        df = pd.DataFrame(rows, columns=["date", "change"])
+        df["balance"] = df["change"].cumsum()
+        return df
+
+
+# 기간 비교 기준 컬럼
+PERIOD_DIMENSIONS = ["category", "account", "card"]
+
+
+class PeriodAggregate:
+    """(기준 컬럼, 유형) 별 [키 × 월] 금액 배열
+
+    - 월 번호는 year * 12 + month - 1, 배열의 열 0 이 first 월
+    - 기간 합계는 월 누적합의 차이로 구하므로 기간 길이와 거래 수에 관계없이 키 수에 비례
+    - 누적합은 변경 후 처음 조회할 때 다시 계산 (키 수 × 월 수)
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.first = 0
+        self.months = 0
+        self.keys = {}    # (기준, 유형) -> {키: 행 번호}
+        self.values = {}  # (기준, 유형) -> int64 배열 [키 수, 월 수]
+        self._cumsum = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    @profile.timed("aggregate")
+    def from_transactions(cls, transactions, version=None):
+        """거래 DataFrame(store.compact_transactions 형태)에서 기준 컬럼별 groupby 한 번씩으로 생성"""
+        periods = cls(version)
+        dated = transactions[transactions["year"] > 0]
+        if dated.empty:
+            return periods
+        month_no = dated["year"].astype("int64") * 12 + dated["month"].astype("int64") - 1
+        periods.first = int(month_no.min())
+        periods.months = int(month_no.max()) - periods.first + 1
+        columns = (month_no - periods.first).rename("column")
+        for by in PERIOD_DIMENSIONS:
+            grouped = dated["amount"].groupby([dated[by], dated["type"], columns], observed=True).sum()
+            for type_ in grouped.index.get_level_values(1).unique():
+                part = grouped.xs(type_, level=1)
+                part = part[part.index.get_level_values(0) != ""]
+                codes, names = pd.factorize(part.index.get_level_values(0))
+                values = np.zeros((len(names), periods.months), dtype="int64")
+                np.add.at(values, (codes, part.index.get_level_values(1).to_numpy()), part.to_numpy())
+                periods.keys[(by, type_)] = {name: i for i, name in enumerate(names)}
+                periods.values[(by, type_)] = values
+        return periods
+
+    # -------------------------
+    # 증분 갱신
+    # -------------------------
+    def _grow(self, month_no):
+        """month_no 가 배열 범위 밖이면 열을 늘림"""
+        if self.months == 0:
+            self.first, self.months = month_no, 1
+            for key, values in self.values.items():
+                self.values[key] = np.zeros((len(values), 1), dtype="int64")
+            self._cumsum.clear()
+            return
+        left = max(0, self.first - month_no)
+        right = max(0, month_no - (self.first + self.months - 1))
+        if left or right:
+            for key, values in self.values.items():
+                self.values[key] = np.pad(values, ((0, 0), (left, right)))
+            self.first -= left
+            self.months += left + right
+            self._cumsum.clear()
+
+    def _apply(self, row, sign):
+        date = pd.to_datetime(row.get("date"), errors="coerce")
+        if pd.isna(date):
+            return
+        month_no = date.year * 12 + date.month - 1
+        type_ = _text(row.get("type"))
+        amount = sign * _amount(row.get("amount"))
+        with self._lock:
+            self._grow(month_no)
+            for by in PERIOD_DIMENSIONS:
+                name = _text(row.get(by))
+                if name == "":
+                    continue
+                keys = self.keys.setdefault((by, type_), {})
+                values = self.values.get((by, type_))
+                if values is None:
+                    values = np.zeros((0, self.months), dtype="int64")
+                if name not in keys:
+                    keys[name] = len(keys)
+                    values = np.vstack([values, np.zeros((1, self.months), dtype="int64")])
+                values[keys[name], month_no - self.first] += amount
+                self.values[(by, type_)] = values
+                self._cumsum.pop((by, type_), None)
+
+    def add(self, row):
+        self._apply(row, 1)
+
+    def remove(self, row):
+        self._apply(row, -1)
+
+    # -------------------------
+    # 조회
+    # -------------------------
+    def _window(self, by, type_, end, length):
+        """월 번호 end 까지 length 개월 합계 (키 이름 목록, 금액 배열)"""
+        key = (by, type_)
+        cumsum = self._cumsum.get(key)
+        if cumsum is None:
+            values = self.values.get(key, np.zeros((0, self.months), dtype="int64"))
+            cumsum = np.zeros((len(values), self.months + 1), dtype="int64")
+            np.cumsum(values, axis=1, out=cumsum[:, 1:])
+            self._cumsum[key] = cumsum
+        stop = min(max(end - self.first + 1, 0), self.months)
+        start = min(max(end - length - self.first + 1, 0), self.months)
+        return cumsum[:, stop] - cumsum[:, start]
+
+    def _compare(self, by, type_, windows):
+        """windows: {컬럼: (끝 월 번호, 개월 수)} → {by: 키 배열, 컬럼: 금액 배열} (모두 0 인 키 제외)"""
+        with self._lock:
+            names = np.array(list(self.keys.get((by, type_), {})), dtype=object)
+            columns = {column: self._window(by, type_, end, length) for column, (end, length) in windows.items()}
+        keep = np.zeros(len(names), dtype=bool)
+        for values in columns.values():
+            keep |= values != 0
+        return {by: names[keep], **{column: values[keep] for column, values in columns.items()}}
+
+    @staticmethod
+    def _change(current, base):
+        """base 대비 증감률(%) (base 가 0 이면 NaN)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(base != 0, (current - base) / np.where(base != 0, base, 1) * 100, np.nan)
+
+    @staticmethod
+    def _frame(columns):
+        df = pd.DataFrame(columns)
+        return df.sort_values("amount", ascending=False, ignore_index=True) if len(df) else df
+
+    @profile.timed("aggregate")
+    def compare_month(self, by, year, month, type):
+        """by 별 해당 월 금액과 전월/전년 동월/최근 12개월(전년 대비) 비교 DataFrame
+
+        [by, amount, prev_month, mom_pct, last_year, yoy_pct, ttm, prev_ttm, ttm_pct]
+        """
+        end = year * 12 + month - 1
+        c = self._compare(by, type, {
+            "amount": (end, 1),
+            "prev_month": (end - 1, 1),
+            "last_year": (end - 12, 1),
+            "ttm": (end, 12),
+            "prev_ttm": (end - 12, 12),
+        })
+        return self._frame({
+            by: c[by],
+            "amount": c["amount"],
+            "prev_month": c["prev_month"],
+            "mom_pct": self._change(c["amount"], c["prev_month"]),
+            "last_year": c["last_year"],
+            "yoy_pct": self._change(c["amount"], c["last_year"]),
+            "ttm": c["ttm"],
+            "prev_ttm": c["prev_ttm"],
+            "ttm_pct": self._change(c["ttm"], c["prev_ttm"]),
+        })
+
+    @profile.timed("aggregate")
+    def compare_year(self, by, year, type):
+        """by 별 해당 연도 금액과 전년 비교 DataFrame [by, amount, prev_year, yoy_pct]"""
+        end = year * 12 + 11
+        c = self._compare(by, type, {"amount": (end, 12), "prev_year": (end - 12, 12)})
+        c["yoy_pct"] = self._change(c["amount"], c["prev_year"])
+        return self._frame(c)
+
+
+class MemoIndex:
+    """메모 역색인 (문자 1~3-gram → 문서 번호)
+
+    - 한글은 띄어쓰기/조사 때문에 단어 단위 색인이 맞지 않아 문자 n-gram 을 사용
+    - 단어 첫 1~3글자는 앞부분 일치 검색용 gram 으로 따로 색인
+    - 전체 생성 시의 목록은 정렬된 int32 배열, 이후 추가분은 set 으로 보관
+    - 문서 번호 → 거래 DataFrame 의 행 위치를 저장소와 같은 규칙으로 유지해 검색 결과를 행 위치로 반환
+      (삭제는 뒤 행이 한 칸씩 당겨짐, 수정은 제자리, 추가는 끝 — 삭제/수정 전 문서는 위치 -1)
+    """
+
+    WORD_START = "\x02"
+    GRAM = 3           # 이 길이까지의 검색어는 gram 하나로 정확히 일치 (더 길면 메모로 확인)
+
+    def __init__(self, version=None):
+        self.version = version
+        self.memos = []    # 문서 번호 → 소문자 메모
+        self.docs = {}     # 거래 id → 문서 번호
+        self.base = {}     # gram → 정렬된 문서 번호 배열
+        self.added = {}    # gram → 추가된 문서 번호 set
+        self.positions = np.empty(0, dtype=np.int64)  # 문서 번호 → 행 위치 (없으면 -1)
+        self.rows = 0      # 현재 행 수
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _grams(cls, text):
+        grams = set()
+        for word in text.split():
+            for n in range(1, cls.GRAM + 1):
+                grams.update(word[i:i + n] for i in range(len(word) - n + 1))
+                grams.add(cls.WORD_START + word[:n])
+        return grams
+
+    @classmethod
+    def _term_grams(cls, term, prefix):
+        n = min(len(term), cls.GRAM)
+        grams = {term[i:i + n] for i in range(len(term) - n + 1)}
+        if prefix:
+            grams.add(cls.WORD_START + term[:n])
+        return grams
+
+    @staticmethod
+    def query_terms(query):
+        """검색어 → [(소문자 검색어, 앞부분 일치 여부)]"""
+        terms = []
+        for term in query.lower().split():
+            prefix = term.endswith("*")
+            term = term.rstrip("*")
+            if term:
+                terms.append((term, prefix))
+        return terms
+
+    @staticmethod
+    def _matches(memo, term, prefix):
+        if prefix:
+            return any(w.startswith(term) for w in memo.split())
+        return term in memo
+
+    @classmethod
+    @profile.timed("aggregate")
+    def from_transactions(cls, transactions, version=None):
+        index = cls(version)
+        if transactions.empty:
+            return index
+        memos = transactions["memo"].fillna("").astype(str).str.lower()
+        index.memos = memos.tolist()
+        index.docs = {tid: doc for doc, tid in enumerate(transactions["id"].astype(str))}
+        index.positions = np.arange(len(transactions), dtype=np.int64)
+        index.rows = len(transactions)
+
+        # 같은 메모가 많으므로 gram 은 서로 다른 메모마다 한 번만 만들고 문서로 펼침
+        memo_codes, unique_memos = pd.factorize(memos)
+        memo_grams = [list(cls._grams(memo)) for memo in unique_memos]
+        sizes = np.fromiter(map(len, memo_grams), dtype=np.int64, count=len(memo_grams))
+        if not sizes.sum():
+            return index
+        gram_codes, uniques = pd.factorize(pd.Series([g for grams in memo_grams for g in grams], dtype=object))
+        starts = np.cumsum(sizes) - sizes
+        lengths = sizes[memo_codes]
+        docs = np.repeat(np.arange(len(memos), dtype=np.int32), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        codes = gram_codes[np.repeat(starts[memo_codes], lengths) + offsets]
+        order = np.argsort(codes, kind="stable")  # 같은 gram 안에서는 문서 번호 오름차순 유지
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        index.base = dict(zip(uniques, np.split(docs[order], bounds)))
+        return index
+
+    def _add_doc(self, row, position):
+        tid = _text(row.get("id"))
+        memo = _text(row.get("memo")).lower()
+        doc = len(self.memos)
+        self.memos.append(memo)
+        self.docs[tid] = doc
+        self.positions = np.append(self.positions, position)
+        for gram in self._grams(memo):
+            self.added.setdefault(gram, set()).add(doc)
+
+    def _drop_doc(self, row):
+        """문서를 검색 결과에서 빼고 그 행 위치 반환 (없으면 None)"""
+        doc = self.docs.pop(_text(row.get("id")), None)
+        if doc is None:
+            return None
+        position = int(self.positions[doc])
+        self.positions[doc] = -1
+        return position
+
+    def add(self, row):
+        with self._lock:
+            self._add_doc(row, self.rows)
+            self.rows += 1
+
+    def remove(self, row):
+        with self._lock:
+            position = self._drop_doc(row)
+            if position is not None:
+                self.positions[self.positions > position] -= 1
+                self.rows -= 1
+
+    def update(self, old, new):
+        """수정된 행은 DataFrame 에서 제자리에 있으므로 같은 위치의 새 문서로 바꿈"""
+        with self._lock:
+            position = self._drop_doc(old)
+            if position is None:
+                self._add_doc(new, self.rows)
+                self.rows += 1
+            else:
+                self._add_doc(new, position)
+
+    def _postings(self, gram):
+        base = self.base.get(gram)
+        added = self.added.get(gram)
+        if not added:
+            return base if base is not None else np.empty(0, dtype=np.int32)
+        extra = np.sort(np.fromiter(added, dtype=np.int32, count=len(added)))  # set 순서는 정렬돼 있지 않음
+        # 추가된 문서 번호는 전체 생성 때의 번호보다 모두 크므로 이어 붙여도 정렬 유지
+        return extra if base is None else np.concatenate((base, extra))
+
+    @staticmethod
+    def _intersect(candidates, postings):
+        """정렬된 두 배열의 교집합 (candidates 가 작을 때 이진 탐색으로 빠름)"""
+        if len(postings) == 0:
+            return postings
+        pos = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+        return candidates[postings[pos] == candidates]
+
+    @profile.timed("aggregate")
+    def search(self, query):
+        """공백으로 나눈 모든 검색어를 포함하는 거래의 행 위치 배열 (오름차순)
+
+        - 검색어는 부분 문자열로 일치 (대소문자 무시)
+        - 검색어 끝에 * 를 붙이면 메모의 단어가 그 검색어로 시작하는 경우만 일치
+        """
+        terms = self.query_terms(query)
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+
+        with self._lock:
+            grams = set()
+            for term, prefix in terms:
+                grams |= self._term_grams(term, prefix)
+            lists = sorted((self._postings(g) for g in grams), key=len)
+            candidates = lists[0]
+            for postings in lists[1:]:
+                if len(candidates) == 0:
+                    break
+                candidates = self._intersect(candidates, postings)
+
+            # n-gram 이 모두 있어도 순서가 다를 수 있으므로 GRAM 글자를 넘는 검색어만 메모로 확인
+            # (그 이하는 검색어 자체가 gram 이라 정확히 걸러지고, 긴 검색어는 후보가 이미 적음)
+            verify = [(term, prefix) for term, prefix in terms if len(term) > self.GRAM]
+            if verify and len(candidates):
+                memos = self.memos
+                candidates = np.fromiter(
+                    (d for d in candidates
+                     if all(self._matches(memos[d], term, prefix) for term, prefix in verify)),
+                    dtype=np.int32,
+                )
+
+            positions = self.positions[candidates]
+            return np.sort(positions[positions >= 0])  # 삭제/수정 전 문서 제외
+
+
+# -------------------------
+# 거래 목록 페이지 조회
+# -------------------------
+@profile.timed("aggregate")
+def filter_transactions(transactions, year=None, month=None, positions=None):
+    """조건에 맞는 행 위치 배열 (DataFrame 복사 없이 마스크만 계산)
+
+    positions 는 같은 버전의 메모 검색 결과 (search_memos, 그 행들 중에서만 거름)
+    """
+    if positions is not None and year is None and month is None:
+        return positions
+    mask = np.ones(len(transactions), dtype=bool)
+    if year is not None:
+        mask &= transactions["year"].to_numpy() == year
+    if month is not None:
+        mask &= transactions["month"].to_numpy() == month
+    if positions is not None:
+        return positions[mask[positions]]
+    return np.flatnonzero(mask)
+
+
+@profile.timed("aggregate")
+def scan_memos(transactions, query):
+    """메모 색인 없이 전체 메모에서 검색 (MemoIndex.search 와 같은 규칙, 행 위치 배열)"""
+    memos = transactions["memo"].fillna("").astype(str).str.lower()
+    mask = np.ones(len(transactions), dtype=bool)
+    for term, prefix in MemoIndex.query_terms(query):
+        if prefix:
+            mask &= memos.str.contains(r"(?:^|\s)" + re.escape(term), regex=True).to_numpy()
+        else:
+            mask &= memos.str.contains(term, regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def search_memos(transactions, version, query, db_path=store.DB_FILE):
+    """version 시점의 transactions 에서 메모 검색 결과 행 위치 배열
+
+    색인은 자기 버전의 행 위치를 돌려주므로 버전이 같을 때만 사용하고,
+    다르면 (다른 세션이 그 사이 수정/삭제) 이번에는 전체 메모에서 검색
+    """
+    index = get_memo_index(db_path)
+    seen = index.version
+    if seen is not None and seen == version:
+        positions = index.search(query)
+        if index.version == seen:  # 검색 도중 변경 알림이 적용되지 않았으면
+            return positions
+    return scan_memos(transactions, query)
+
+
+def _sort_keys(column):
+    """정렬용 int64 키 (날짜는 NaT 가 가장 작은 값)"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column.to_numpy().view("int64")
+    return column.fillna(0).to_numpy().astype("int64")
+
+
+@profile.timed("aggregate")
+def page_transactions(transactions, positions, sort_by="date", ascending=False, page=0, page_size=50):
+    """positions 중 page 번째 페이지의 행 DataFrame
+
+    앞 페이지까지의 키 이하인 행만 골라 정렬하므로 전체 정렬을 하지 않음
+    정렬 키가 같은 행은 행 위치 순서 (페이지를 넘겨도 빠지거나 겹치는 행이 없음)
+    """
+    keys = _sort_keys(transactions[sort_by])[positions]
+    if not ascending:
+        keys = ~keys  # 순서 뒤집기 (-x 와 달리 오버플로 없음)
+    stop = min((page + 1) * page_size, len(positions))
+    start = min(page * page_size, stop)
+    if stop < len(positions):
+        # argpartition 은 경계의 같은 키 중 아무 행이나 고르므로 경계 키와 같은 행은 모두 포함
+        boundary = np.partition(keys, stop - 1)[stop - 1]
+        head = np.flatnonzero(keys <= boundary)
+    else:
+        head = np.arange(len(positions))
+    head = head[np.lexsort((positions[head], keys[head]))]
+    return transactions.iloc[positions[head[start:stop]]]
+
+
+@profile.timed("aggregate")
+def lookup_transactions(transactions, query, limit=20):
+    """날짜(YYYY-MM-DD), 금액(숫자) 또는 ID 앞부분으로 거래 찾기"""
+    query = query.strip()
+    if not query:
+        return transactions.iloc[:0]
+    # 해석 가능한 조건은 모두 적용 (숫자만 있는 입력은 금액과 ID 앞부분 모두 가능)
+    mask = transactions["id"].astype(str).str.startswith(query).to_numpy().copy()
+    date = pd.to_datetime(query, format="%Y-%m-%d", errors="coerce")
+    if not pd.isna(date):
+        dates = transactions["date"]
+        mask |= ((dates >= date) & (dates < date + pd.Timedelta(days=1))).to_numpy()
+    amount = query.replace(",", "")
+    if amount.isdigit():
+        mask |= (transactions["amount"] == int(amount)).to_numpy()
+    return transactions.iloc[np.flatnonzero(mask)[:limit]]
+
+
+# -------------------------
+# DB 별 집계 보관 (큐브, 잔액 원장)
+# - 거래 테이블 버전이 같으면 그대로 사용
+# - 앱의 쓰기는 변경 알림으로 받아 증분 갱신 (버전이 건너뛰면 다음 조회 때 다시 생성)
+# -------------------------
+VIEWS = {
+    "cube": AggregateCube,
+    "ledger": BalanceLedger,
+    "memo": MemoIndex,
+    "periods": PeriodAggregate,
+}
+
+_views = {}  # (db 경로, 이름) -> 집계 객체
+_views_lock = threading.Lock()
+
+
+def _get_view(name, db_path):
+    key = (os.path.abspath(db_path), name)
+    version = store.table_versions(db_path).get("transactions")
+    with _views_lock:
+        view = _views.get(key)
+        if view is not None and view.version == version:
+            return view
+    version, transactions = store.load_versioned("transactions", db_path)
+    view = VIEWS[name].from_transactions(transactions, version)
+    with _views_lock:
+        _views[key] = view
+    return view
+
+
+def get_cube(db_path=store.DB_FILE):
+    return _get_view("cube", db_path)
+
+
+def get_ledger(db_path=store.DB_FILE):
+    return _get_view("ledger", db_path)
+
+
+def get_memo_index(db_path=store.DB_FILE):
+    return _get_view("memo", db_path)
+
+
+def get_periods(db_path=store.DB_FILE):
+    return _get_view("periods", db_path)
+
+
+def _on_change(db_path, table, changes, version):
+    if table != "transactions":
+        return
+    path = os.path.abspath(db_path)
+    with _views_lock:
+        for name in VIEWS:
+            view = _views.get((path, name))
+            if view is None:
+                continue
+            if changes is None or view.version is None or view.version + 1 != version:
+                del _views[(path, name)]
+                continue
+            view.version = None  # 적용하는 동안은 어느 버전도 아님 (search_memos 가 확인)
+            for old, new in changes:
+                if old is not None and new is not None and hasattr(view, "update"):
+                    view.update(old, new)  # 행 위치를 유지하는 집계 (메모 색인)
+                    continue
+                if old is not None:
+                    view.remove(old)
+                if new is not None:
+                    view.add(new)
+            view.version = version
+
+
+store.add_listener(_on_change)
@@ -0,0 +1,604 @@
+# accounting_bench.py
+# -------------------------
+# accounting.py 성능 측정
+# - snapshot: 콜드 스타트 시 거래 테이블 읽기 시간 비교 (엑셀 / SQLite / Parquet 스냅샷)
+# - schema: 거래 테이블 메모리 표현 비교 (문자열 컬럼 / category + 연·월 컬럼)
+# - concurrency: 여러 세션이 동시에 입력/수정할 때 처리량, 충돌 수, 유실 여부
+# - ops: 핵심 작업(읽기, 입력, 수정, 삭제, 대시보드, 월별 통계, 잔액, 기간 비교, 메모 검색)의 처리량과 지연 분포
+# - generate: 가짜 데이터로 accounting.xlsx / accounting.db 만들기
+# - memo: 메모 색인 검색 결과를 전체 메모 검색과 비교 (색인 생성 뒤 추가된 거래 포함)
+#
+# 사용 예)
+#   python accounting_bench.py snapshot --sizes 10000 100000 1000000
+#   python accounting_bench.py schema --sizes 10000 100000 1000000
+#   python accounting_bench.py concurrency --sessions 8 --ops 200 --processes
+#   python accounting_bench.py ops --sizes 1000 10000 100000 1000000 --csv ops.csv
+#   python accounting_bench.py generate --rows 100000 --accounts 10 --cards 6 --xlsx accounting.xlsx --db accounting.db
+#   python accounting_bench.py memo --rows 1020
+# -------------------------
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import accounting_analytics as analytics
+import accounting_dashboard as dashboard
+import accounting_store as store
+from accounting_report import MAX_SHEET_ROWS
+
+ACCOUNTS = ["국민은행", "신한은행", "우리은행", "카카오뱅크", "현금"]
+CARDS = ["", "신한카드", "현대카드", "삼성카드"]
+CATEGORIES = {
+    "지출": ["식비", "교통", "주거", "통신", "의료", "쇼핑", "여가", "교육"],
+    "수입": ["급여", "상여", "이자", "기타수입"],
+}
+USERS = ["홍길동", "김철수", "이영희"]
+
+# 항목별 메모 단어 (목록에 없는 항목은 기타 단어 사용)
+MEMO_WORDS = {
+    "식비": ["점심", "저녁", "커피", "회식", "간식", "도시락"],
+    "교통": ["택시비", "주유", "주차", "KTX", "버스", "톨게이트"],
+    "주거": ["관리비", "월세", "전기요금", "수도요금", "가스요금"],
+    "통신": ["휴대폰 요금", "인터넷", "클라우드"],
+    "의료": ["병원", "약국", "건강검진"],
+    "쇼핑": ["사무용품", "비품", "소모품", "온라인 구매"],
+    "여가": ["워크숍", "행사", "선물"],
+    "교육": ["세미나", "교육비", "도서 구입"],
+    "급여": ["월 급여"],
+    "상여": ["성과급", "명절 상여"],
+    "이자": ["예금 이자"],
+    "기타수입": ["환급", "잡수입", "보조금"],
+}
+OTHER_WORDS = ["기타", "정산", "지급", "결제"]
+PLACES = ["본사", "강남점", "판교", "부산지사", "온라인", "협력사", "거래처"]
+
+
+def _names(base, count, label):
+    """base 를 앞에서부터 count 개 사용하고 모자라면 "{label} N" 으로 채움 (count 가 None 이면 base 그대로)"""
+    if count is None:
+        return list(base)
+    return list(base[:count]) + [f"{label} {i}" for i in range(len(base) + 1, count + 1)]
+
+
+def _category_names(count):
+    if count is None:
+        return {type_: list(names) for type_, names in CATEGORIES.items()}
+    income = max(1, round(count * len(CATEGORIES["수입"]) / sum(map(len, CATEGORIES.values()))))
+    return {
+        "지출": _names(CATEGORIES["지출"], max(1, count - income), "지출항목"),
+        "수입": _names(CATEGORIES["수입"], income, "수입항목"),
+    }
+
+
+def _sample_dates(rng, n, first, last):
+    """평일 업무 시간에 몰리고 시간이 지날수록 거래가 늘어나는 날짜 n 개"""
+    days = pd.date_range(first.normalize(), last.normalize(), freq="D")
+    weights = np.where(days.dayofweek < 5, 1.0, 0.3)
+    weights = weights * np.linspace(1.0, 2.0, len(days))  # 사업 규모가 점점 커짐
+    weights[days.month == 12] *= 1.3                        # 연말
+    day = days[rng.choice(len(days), n, p=weights / weights.sum())]
+    seconds = np.clip(rng.normal(13.5, 3.0, n), 0, 23.99) * 3600
+    return day + pd.to_timedelta(seconds.astype("int64"), unit="s")
+
+
+# -------------------------
+# 가짜 데이터
+# -------------------------
+def make_sample(n, seed=0, start="2015-01-01", end="2025-12-31",
+                accounts=None, cards=None, categories=None, users=None):
+    """거래 n 건과 계좌/카드/항목/사용자 테이블을 만들어 {테이블: DataFrame} 반환
+
+    accounts/cards/categories/users 로 각 테이블 행 수 지정 (None 이면 기본 목록)
+    - 거래는 평일 낮에 많고 기간 후반으로 갈수록 늘어남, 급여/상여 수입은 대부분 매월 25일
+    - 지출 금액은 로그정규 분포, 수입은 더 큰 금액
+    """
+    rng = np.random.default_rng(seed)
+    first, last = pd.Timestamp(start), pd.Timestamp(end)
+    account_names = _names(ACCOUNTS, accounts, "계좌")
+    card_names = _names(CARDS[1:], cards, "카드")
+    category_names = _category_names(categories)
+    user_names = _names(USERS, users, "사용자")
+
+    dates = _sample_dates(rng, n, first, last)
+    types = np.where(rng.random(n) < 0.85, "지출", "수입")
+    category = np.empty(n, dtype=object)
+    for type_, names in category_names.items():
+        mask = types == type_
+        category[mask] = rng.choice(names, mask.sum())
+    payday = np.isin(category, ["급여", "상여"]) & (rng.random(n) < 0.8)
+    dates = dates.where(~payday, dates + pd.to_timedelta(25 - dates.day, unit="D"))
+    dates = dates.where(dates <= last, last)
+    order = np.argsort(dates.to_numpy(), kind="stable")
+    dates, types, category = dates[order], types[order], category[order]
+
+    amount = np.where(types == "지출", rng.lognormal(9.5, 1.0, n), rng.lognormal(13.5, 0.5, n))
+    words = np.empty(n, dtype=object)
+    for name in np.unique(category):
+        mask = category == name
+        words[mask] = rng.choice(MEMO_WORDS.get(name, OTHER_WORDS), mask.sum())
+    memo = pd.Series(words) + " " + pd.Series(rng.choice(PLACES, n))
+    # 입력은 거래 후 몇 시간 ~ 사흘 사이
+    created_at = dates + pd.to_timedelta(rng.integers(600, 3 * 86400, n), unit="s")
+
+    transactions = pd.DataFrame({
+        "id": [str(uuid.uuid4()) for _ in range(n)],
+        "date": dates,
+        "type": types,
+        "amount": (amount.round(-1)).astype("int64"),
+        "account": rng.choice(account_names, n),
+        "card": np.where((types == "지출") & (rng.random(n) < 0.7), rng.choice(card_names, n), ""),
+        "category": category,
+        "memo": memo.to_numpy(),
+        "created_by": rng.choice(user_names, n),
+        "created_at": created_at,
+    })
+    return {
+        "transactions": transactions,
+        "accounts": pd.DataFrame({
+            "account_name": account_names, "bank": "", "account_number": "", "memo": "",
+        }),
+        "cards": pd.DataFrame({
+            "card_name": card_names, "issuer": "",
+            "linked_account": [account_names[i % len(account_names)] for i in range(len(card_names))],
+            "memo": "",
+        }),
+        "categories": pd.DataFrame(
+            [(name, type_, "") for type_, names in category_names.items() for name in names],
+            columns=["category_name", "type", "description"],
+        ),
+        "users": pd.DataFrame({
+            "user_id": [str(uuid.uuid4()) for _ in user_names], "name": user_names, "role": "",
+        }),
+    }
+
+
+def _timed(func, repeat=1):
+    """repeat 번 실행 중 가장 짧은 시간(초)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+# -------------------------
+# 콜드 스타트 (엑셀 / SQLite / 스냅샷)
+# -------------------------
+# 백그라운드 스냅샷 저장을 기다리는 최대 시간 (초)
+SNAPSHOT_TIMEOUT = 120
+
+
+def bench_snapshot(sizes, xlsx_limit=100000):
+    """크기별 거래 테이블 첫 읽기 시간(초) 목록 반환
+
+    엑셀은 xlsx_limit 행 이하일 때만 측정 (openpyxl 은 100만 행에 수 분이 걸림)
+    """
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, store.DB_FILE)
+            xlsx_path = os.path.join(tmp, store.XLSX_FILE)
+            data = make_sample(n)
+            store.import_frames(data, db_path)
+            row = {"rows": n, "xlsx": None}
+
+            if n <= xlsx_limit:
+                store.save_excel(data, xlsx_path)
+                row["xlsx"] = _timed(lambda: pd.read_excel(xlsx_path, "transactions"))
+
+            # 스냅샷이 없을 때 (SQLite 에서 읽기)
+            store._invalidate(db_path)
+            with store.transaction(db_path) as conn:
+                db_id = store._db_id(conn)
+            version = store.table_versions(db_path)["transactions"]
+            row["sqlite"] = _timed(lambda: store.load_table("transactions", db_path))
+
+            # 스냅샷이 있을 때 (위 읽기가 백그라운드에서 저장하는 스냅샷을 기다린 뒤 측정)
+            path = store._snapshot_path(db_path, "transactions", db_id, version)
+            deadline = time.monotonic() + SNAPSHOT_TIMEOUT
+            while not os.path.exists(path):
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"{SNAPSHOT_TIMEOUT}초 안에 스냅샷이 저장되지 않았습니다: {path}")
+                time.sleep(0.05)
+            df = store.load_table("transactions", db_path)
+            row["write"] = _timed(lambda: store.write_snapshot("transactions", df, db_id, version, db_path))
+            store._invalidate(db_path)
+            row["parquet"] = _timed(lambda: store.load_table("transactions", db_path))
+            row["size_mb"] = os.path.getsize(path) / 1e6
+            results.append(row)
+    return results
+
+
+def print_snapshot(results):
+    print(f"{'rows':>10} {'xlsx(s)':>9} {'sqlite(s)':>10} {'parquet(s)':>11} {'write(s)':>9} {'size(MB)':>9}")
+    for r in results:
+        xlsx = "-" if r["xlsx"] is None else f"{r['xlsx']:.3f}"
+        print(f"{r['rows']:>10} {xlsx:>9} {r['sqlite']:>10.3f} {r['parquet']:>11.3f} "
+              f"{r['write']:>9.3f} {r['size_mb']:>9.1f}")
+
+
+# -------------------------
+# 메모리 표현 (문자열 / category)
+# -------------------------
+GROUP_BY = ["year", "month", "type", "category"]
+
+
+def _group_strings(df):
+    # 이전 방식: 화면마다 날짜를 다시 해석해 연/월을 만들고 문자열 컬럼으로 groupby
+    dates = pd.to_datetime(df["date"])
+    keys = df.assign(year=dates.dt.year, month=dates.dt.month)
+    return keys.groupby(GROUP_BY)["amount"].sum()
+
+
+def _group_compact(df):
+    return df.groupby(GROUP_BY, observed=True)["amount"].sum()
+
+
+def bench_schema(sizes, repeat=3):
+    """크기별 행당 메모리(바이트)와 (연, 월, 유형, 항목) groupby 시간(초) 목록 반환"""
+    results = []
+    for n in sizes:
+        before = make_sample(n)["transactions"]
+        after = store.compact_transactions(before.copy())
+        assert _group_strings(before).sum() == _group_compact(after).sum()
+        results.append({
+            "rows": n,
+            "bytes_before": before.memory_usage(deep=True).sum() / n,
+            "bytes_after": after.memory_usage(deep=True).sum() / n,
+            "group_before": _timed(lambda: _group_strings(before), repeat),
+            "group_after": _timed(lambda: _group_compact(after), repeat),
+        })
+    return results
+
+
+def print_schema(results):
+    print(f"{'rows':>10} {'B/row 전':>9} {'B/row 후':>9} {'groupby 전(ms)':>15} {'groupby 후(ms)':>15}")
+    for r in results:
+        print(f"{r['rows']:>10} {r['bytes_before']:>9.0f} {r['bytes_after']:>9.0f} "
+              f"{r['group_before'] * 1000:>15.1f} {r['group_after'] * 1000:>15.1f}")
+
+
+# -------------------------
+# 동시 세션 부하 테스트
+# - 세션마다 거래 입력과 공유 거래 1건의 금액 +1 수정을 번갈아 실행
+# - 수정은 행 버전(expected_rev)으로 확인하고 충돌하면 다시 읽어 재시도
+# - 끝나면 입력 건수와 공유 거래 금액으로 유실 여부 확인
+# -------------------------
+def _session(db_path, shared_id, ops, seed):
+    rng = np.random.default_rng(seed)
+    latencies, conflicts = [], 0
+    for i in range(ops):
+        start = time.perf_counter()
+        if i % 2 == 0:
+            store.insert_row("transactions", {
+                "id": str(uuid.uuid4()), "date": datetime.now(), "type": "지출",
+                "amount": int(rng.integers(1000, 100000)), "account": ACCOUNTS[0], "card": "",
+                "category": CATEGORIES["지출"][0], "memo": f"부하 {seed}-{i}",
+                "created_by": USERS[0], "created_at": datetime.now(),
+            }, db_path)
+        else:
+            while True:
+                row = store.get_row("transactions", shared_id, db_path)
+                try:
+                    store.update_row("transactions", shared_id, {"amount": row["amount"] + 1},
+                                     db_path, expected_rev=row[store.REV_COLUMN])
+                    break
+                except store.ConflictError:
+                    conflicts += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, conflicts
+
+
+def bench_concurrency(sessions, ops, processes=False, rows=1000):
+    """sessions 개 세션이 각각 ops 번 쓰는 동안의 결과 dict 반환 (유실이 있으면 AssertionError)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, store.DB_FILE)
+        store.import_frames(make_sample(rows), db_path)
+        shared_id = store.load_table("transactions", db_path)["id"].iloc[0]
+        before = store.get_row("transactions", shared_id, db_path)["amount"]
+
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        start = time.perf_counter()
+        with executor(max_workers=sessions) as pool:
+            futures = [pool.submit(_session, db_path, shared_id, ops, seed) for seed in range(sessions)]
+            results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+
+        inserts, edits = sessions * ((ops + 1) // 2), sessions * (ops // 2)
+        assert len(store.load_table("transactions", db_path)) == rows + inserts, "입력 유실"
+        assert store.get_row("transactions", shared_id, db_path)["amount"] == before + edits, "수정 유실"
+
+    latencies = np.concatenate([r[0] for r in results]) * 1000
+    return {
+        "sessions": sessions,
+        "writes": len(latencies),
+        "seconds": elapsed,
+        "conflicts": sum(r[1] for r in results),
+        "p50": np.percentile(latencies, 50),
+        "p95": np.percentile(latencies, 95),
+        "p99": np.percentile(latencies, 99),
+    }
+
+
+def print_concurrency(r):
+    print(f"세션 {r['sessions']} · 쓰기 {r['writes']}건 · {r['seconds']:.2f}s "
+          f"({r['writes'] / r['seconds']:.0f}건/s) · 충돌 후 재시도 {r['conflicts']}회 · 유실 없음")
+    print(f"지연 p50 {r['p50']:.1f}ms · p95 {r['p95']:.1f}ms · p99 {r['p99']:.1f}ms")
+
+
+# -------------------------
+# 핵심 작업 처리량/지연
+# - 크기별로 새 DB 를 만들고 앱과 같은 경로(저장소, 집계 큐브, 잔액 원장, 메모 색인)로 작업을 반복
+# - 쓰기 작업은 변경 알림(저널, 집계 증분 갱신, 대시보드 미리 만들기)까지 포함한 시간
+# -------------------------
+SEARCH_WORDS = ["택시비", "점심", "관리비", "세미나", "강남점", "커피 본사", "휴대*"]
+
+
+def _measure(op, count):
+    """op(i) 를 count 번 실행한 지연(초) 배열"""
+    latencies = np.empty(count)
+    for i in range(count):
+        start = time.perf_counter()
+        op(i)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def _wait_snapshots(db_path, timeout=SNAPSHOT_TIMEOUT):
+    """한 번 읽어 백그라운드 스냅샷 저장을 시작시키고 모든 테이블 스냅샷이 생길 때까지 대기
+
+    (앱을 다시 시작할 때처럼 스냅샷이 있는 상태의 읽기를 측정)
+    """
+    if not store._has_pyarrow():
+        return
+    store.load_all(db_path)
+    with store.transaction(db_path) as conn:
+        db_id = store._db_id(conn)
+    deadline = time.monotonic() + timeout
+    for table, version in store.table_versions(db_path).items():
+        while (store.latest_snapshot_version(table, db_id, version, db_path) != version
+               and time.monotonic() < deadline):
+            time.sleep(0.05)
+
+
+def _ops(db_path, rng, count):
+    """(작업 이름, op(i), 반복 횟수, 측정 전 한 번 실행할지) 목록
+
+    조회 작업은 먼저 한 번 실행해 집계 큐브/원장/색인을 만든 뒤 측정 (만드는 시간은 load 와 별개)
+    """
+    ids = store.load_table("transactions", db_path)["id"].to_numpy()
+    picked = rng.choice(ids, min(len(ids), count * 2), replace=False)
+    edit_ids, delete_ids = picked[:count], picked[count:]
+    accounts = list(store.load_table("accounts", db_path)["account_name"])
+    years = analytics.get_cube(db_path).years()
+    year_months = analytics.get_cube(db_path).year_months()
+
+    def load(i):
+        store._invalidate(db_path)
+        store.load_all(db_path)
+
+    def insert(i):
+        store.insert_row("transactions", {
+            "id": str(uuid.uuid4()), "date": datetime.now(), "type": "지출",
+            "amount": int(rng.integers(1000, 100000)), "account": accounts[i % len(accounts)], "card": "",
+            "category": CATEGORIES["지출"][0], "memo": f"측정 {i}", "created_by": USERS[0],
+            "created_at": datetime.now(),
+        }, db_path)
+
+    def edit(i):
+        key = edit_ids[i % len(edit_ids)]
+        row = store.get_row("transactions", key, db_path)
+        store.update_row("transactions", key, {"amount": row["amount"] + 1}, db_path,
+                         expected_rev=row[store.REV_COLUMN])
+
+    def delete(i):
+        store.delete_row("transactions", delete_ids[i], db_path)
+
+    def dashboard_(i):
+        dashboard.build_dashboard(analytics.get_cube(db_path), years[i % len(years)])
+
+    def monthly(i):
+        cube = analytics.get_cube(db_path)
+        year, month = year_months[i % len(year_months)]
+        for by in ("category", "card", "account"):
+            for type_ in ("지출", "수입"):
+                cube.sum_by(by, year=year, month=month, type=type_)
+        cube.total(year=year, month=month, type="수입")
+
+    def balance(i):
+        ledger = analytics.get_ledger(db_path)
+        [ledger.balance(acc) for acc in accounts]
+        ledger.history(accounts[i % len(accounts)])
+
+    def compare(i):
+        periods = analytics.get_periods(db_path)
+        year, month = year_months[i % len(year_months)]
+        for by in analytics.PERIOD_DIMENSIONS:
+            periods.compare_month(by, year, month, type="지출")
+            periods.compare_year(by, year, type="지출")
+
+    def memo_search(i):
+        analytics.get_memo_index(db_path).search(SEARCH_WORDS[i % len(SEARCH_WORDS)])
+
+    return [
+        ("load", load, max(3, count // 20), False),
+        ("insert", insert, count, False),
+        ("edit", edit, count, False),
+        ("delete", delete, len(delete_ids), False),
+        ("dashboard", dashboard_, count, True),
+        ("monthly", monthly, count, True),
+        ("balance", balance, count, True),
+        ("compare", compare, count, True),
+        ("memo_search", memo_search, count, True),
+    ]
+
+
+# 색인 생성 뒤 추가할 메모 ("xy" 는 추가분에만 있는 gram)
+ADDED_MEMOS = ["zq xy", "zq", "zq xy", "xy zq", "zq xyw", "zqxy"]
+CHECK_WORDS = SEARCH_WORDS + ["zq xy", "xy zq", "zq*", "xy*", "zqx", "zqxy", "z", "수정됨"]
+
+
+def check_memo_index(rows=1020, seed=0):
+    """메모 색인 검색과 전체 메모 검색 결과가 다른 검색어 목록 (비어 있으면 정상)
+
+    색인을 만든 뒤 앱과 같은 경로로 입력/수정/삭제하고, 검색 결과 행 위치를 다시 읽은 거래 테이블과 비교
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, store.DB_FILE)
+        store.import_frames(make_sample(rows, seed), db_path)
+        analytics.get_memo_index(db_path)
+        ids = store.load_table("transactions", db_path)["id"].to_numpy()
+        for i, memo in enumerate(ADDED_MEMOS):
+            store.insert_row("transactions", {
+                "id": str(uuid.uuid4()), "date": datetime.now(), "type": "지출", "amount": 1000 + i,
+                "account": ACCOUNTS[0], "card": "", "category": CATEGORIES["지출"][0], "memo": memo,
+                "created_by": USERS[0], "created_at": datetime.now(),
+            }, db_path)
+        for key in ids[[5, rows // 2, rows - 1]]:
+            store.update_row("transactions", key, {"memo": "수정됨 zq"}, db_path)
+        for key in ids[[0, 7, rows // 3]]:
+            store.delete_row("transactions", key, db_path)
+
+        index = analytics.get_memo_index(db_path)
+        transactions = store.load_table("transactions", db_path)
+        memos = transactions["memo"].fillna("").str.lower().tolist()
+        failed = []
+        for query in CHECK_WORDS:
+            terms = [(t.rstrip("*"), t.endswith("*")) for t in query.lower().split()]
+            expected = [pos for pos, memo in enumerate(memos)
+                        if all(analytics.MemoIndex._matches(memo, term, prefix) for term, prefix in terms)]
+            found = index.search(query).tolist()
+            if found != expected:
+                failed.append((query, len(expected), len(found)))
+        store._invalidate(db_path)
+    return failed
+
+
+def bench_ops(sizes, count=50, seed=0):
+    """크기별 작업 결과 dict 목록 (rows, op, count, ops_per_s, p50/p95/p99 ms)"""
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, store.DB_FILE)
+            store.import_frames(make_sample(n, seed), db_path)
+            rng = np.random.default_rng(seed)
+            _wait_snapshots(db_path)
+            for name, op, repeat, warm in _ops(db_path, rng, count):
+                if warm:
+                    op(0)
+                latencies = _measure(op, repeat)
+                ms = latencies * 1000
+                results.append({
+                    "rows": n,
+                    "op": name,
+                    "count": repeat,
+                    "ops_per_s": repeat / latencies.sum(),
+                    "p50": np.percentile(ms, 50),
+                    "p95": np.percentile(ms, 95),
+                    "p99": np.percentile(ms, 99),
+                })
+            store._invalidate(db_path)
+    return results
+
+
+def print_ops(results):
+    print(f"{'rows':>10} {'op':<12} {'count':>6} {'ops/s':>10} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9}")
+    for r in results:
+        print(f"{r['rows']:>10} {r['op']:<12} {r['count']:>6} {r['ops_per_s']:>10.1f} "
+              f"{r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f}")
+
+
+# -------------------------
+# 가짜 데이터 파일 만들기
+# -------------------------
+def generate(rows, xlsx_path=None, db_path=None, seed=0, start="2015-01-01", end="2025-12-31", **counts):
+    """make_sample 결과를 엑셀 파일 및/또는 SQLite DB 로 저장"""
+    data = make_sample(rows, seed, start, end, **counts)
+    if xlsx_path is not None:
+        if rows > MAX_SHEET_ROWS:
+            raise ValueError(f"엑셀 시트에는 최대 {MAX_SHEET_ROWS:,}행까지 저장할 수 있습니다.")
+        store.save_excel(data, xlsx_path)
+    if db_path is not None:
+        store.import_frames(data, db_path)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="accounting.py 성능 측정")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="콜드 스타트 읽기 시간 (엑셀 / SQLite / Parquet)")
+    snap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    snap.add_argument("--xlsx-limit", type=int, default=100000,
+                      help="이 행 수 이하일 때만 엑셀 읽기 측정")
+
+    schema = sub.add_parser("schema", help="거래 테이블 행당 메모리와 groupby 시간")
+    schema.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+
+    conc = sub.add_parser("concurrency", help="동시 세션 입력/수정 부하 테스트")
+    conc.add_argument("--sessions", type=int, default=8)
+    conc.add_argument("--ops", type=int, default=200, help="세션별 쓰기 횟수 (입력/수정 번갈아)")
+    conc.add_argument("--processes", action="store_true", help="세션을 스레드 대신 프로세스로 실행")
+
+    ops = sub.add_parser("ops", help="핵심 작업 처리량과 지연 분포")
+    ops.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    ops.add_argument("--count", type=int, default=50, help="작업별 반복 횟수")
+    ops.add_argument("--csv", help="결과를 저장할 CSV 경로")
+
+    gen = sub.add_parser("generate", help="가짜 데이터로 엑셀/DB 파일 만들기")
+    gen.add_argument("--rows", type=int, default=10000, help="거래 수")
+    gen.add_argument("--accounts", type=int)
+    gen.add_argument("--cards", type=int)
+    gen.add_argument("--categories", type=int)
+    gen.add_argument("--users", type=int)
+    gen.add_argument("--start", default="2015-01-01")
+    gen.add_argument("--end", default="2025-12-31")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--xlsx", help="엑셀 파일 경로 (예: accounting.xlsx)")
+    gen.add_argument("--db", help="SQLite DB 경로 (예: accounting.db, 기존 내용은 교체)")
+
+    memo = sub.add_parser("memo", help="메모 색인 검색 결과 확인")
+    memo.add_argument("--rows", type=int, default=1020)
+    memo.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "snapshot":
+        if not store._has_pyarrow():
+            parser.error("pyarrow 가 필요합니다 (pip install pyarrow)")
+        print_snapshot(bench_snapshot(args.sizes, args.xlsx_limit))
+    elif args.command == "schema":
+        print_schema(bench_schema(args.sizes))
+    elif args.command == "concurrency":
+        print_concurrency(bench_concurrency(args.sessions, args.ops, args.processes))
+    elif args.command == "ops":
+        results = bench_ops(args.sizes, args.count)
+        print_ops(results)
+        if args.csv:
+            pd.DataFrame(results).to_csv(args.csv, index=False)
+    elif args.command == "generate":
+        if args.xlsx is None and args.db is None:
+            parser.error("--xlsx 또는 --db 중 하나 이상 지정하세요")
+        counts = {"accounts": args.accounts, "cards": args.cards,
+                  "categories": args.categories, "users": args.users}
+        data = generate(args.rows, args.xlsx, args.db, args.seed, args.start, args.end, **counts)
+        print(", ".join(f"{table} {len(df):,}행" for table, df in data.items()))
+    elif args.command == "memo":
+        failed = check_memo_index(args.rows, args.seed)
+        for query, expected, found in failed:
+            print(f"[불일치] {query!r}: 전체 검색 {expected}건, 색인 {found}건")
+        print("메모 색인 확인: " + ("정상" if not failed else f"{len(failed)}개 검색어 불일치"))
+        if failed:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
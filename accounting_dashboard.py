@@ -0,0 +1,166 @@
+# accounting_dashboard.py
+# -------------------------
+# 대시보드 차트/표 캐시
+# - (DB, 연도, 거래 테이블 버전) 별로 만든 plotly 차트와 요약 표를 LRU 로 보관
+# - 거래가 바뀌면 백그라운드 스레드에서 최근 본 연도들을 새 버전으로 미리 만들어 둠
+#   (연도 선택을 바꾸거나 저장 직후 다시 그려도 바로 표시)
+# -------------------------
+
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+import plotly.express as px
+
+import accounting_analytics as analytics
+import accounting_profile as profile
+import accounting_store as store
+
+CACHE_SIZE = 32
+
+# (소제목, 기준 컬럼, 유형, 차트, 제목, 데이터가 없을 때 안내 — None 이면 빈 차트 표시)
+PANELS = [
+    ("💳 카드별 지출 비중", "card", "지출", "pie", "{year}년 카드별 지출 비중", "지출 데이터가 없습니다."),
+    ("🏦 계좌별 수입 비중", "account", "수입", "pie", "{year}년 계좌별 수입 비중", "수입 데이터가 없습니다."),
+    ("🏦 계좌별 지출 비중", "account", "지출", "pie", "{year}년 계좌별 지출 비중", "지출 데이터가 없습니다."),
+    ("📉 월별 지출 추세", "month", "지출", "line", "{year}년 월별 지출 추세", None),
+    ("📉 월별 수입 추세", "month", "수입", "line", "{year}년 월별 수입 추세", None),
+]
+
+
+@dataclass
+class Panel:
+    """대시보드 한 칸 (figure 가 None 이면 message 표시)"""
+    subheader: str
+    table: pd.DataFrame
+    figure: object = None
+    message: str = None
+
+
+@profile.timed("chart")
+def build_dashboard(cube, year):
+    """큐브에서 year 의 대시보드 칸 목록 생성"""
+    panels = []
+    for subheader, by, type_, chart, title, empty in PANELS:
+        table = cube.sum_by(by, year=year, type=type_)
+        if table.empty and empty is not None:
+            panels.append(Panel(subheader, table, message=empty))
+            continue
+        title = title.format(year=year)
+        if chart == "pie":
+            fig = px.pie(table, names=by, values="amount", title=title)
+        else:
+            fig = px.line(table, x=by, y="amount", markers=True, title=title)
+        panels.append(Panel(subheader, table, fig))
+    return panels
+
+
+# -------------------------
+# LRU 캐시
+# -------------------------
+class LRUCache:
+    def __init__(self, capacity=CACHE_SIZE):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self.items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.capacity:
+                self.items.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self.items
+
+    def recent_keys(self):
+        """최근 사용한 것부터 키 목록"""
+        with self._lock:
+            return list(reversed(self.items))
+
+
+_cache = LRUCache()
+
+
+def get_dashboard(year, db_path=store.DB_FILE):
+    """year 의 대시보드 칸 목록 (같은 데이터 버전이면 캐시에서)"""
+    cube = analytics.get_cube(db_path)
+    key = (os.path.abspath(db_path), year, cube.version)
+    panels = _cache.get(key)
+    if panels is None:
+        panels = build_dashboard(cube, year)
+        _cache.put(key, panels)
+    return panels
+
+
+def cache_stats():
+    return {"hits": _cache.hits, "misses": _cache.misses, "size": len(_cache.items)}
+
+
+# -------------------------
+# 쓰기 후 미리 만들기
+# - 쓰기마다 스레드를 새로 만들지 않고, 실행 중이면 끝난 뒤 한 번 더 실행하도록 표시
+# -------------------------
+_warm_lock = threading.Lock()
+_warm_pending = set()   # 다시 만들어야 하는 DB 경로
+_warm_running = False
+
+
+def warm(db_path=store.DB_FILE):
+    """최근 본 연도(없으면 가장 최근 연도)의 대시보드를 현재 버전으로 만들어 둠"""
+    path = os.path.abspath(db_path)
+    cube = analytics.get_cube(db_path)
+    years = []
+    for key_path, year, _ in _cache.recent_keys():
+        if key_path == path and year not in years:
+            years.append(year)
+    if not years and cube.years():
+        years = [cube.years()[-1]]
+    for year in reversed(years[:CACHE_SIZE]):  # 최근 본 연도가 LRU 의 가장 뒤에 오도록
+        if (path, year, cube.version) not in _cache:
+            _cache.put((path, year, cube.version), build_dashboard(cube, year))
+
+
+def _warm_loop():
+    global _warm_running
+    while True:
+        with _warm_lock:
+            if not _warm_pending:
+                _warm_running = False
+                return
+            db_path = _warm_pending.pop()
+        try:
+            warm(db_path)
+        except Exception:
+            pass  # 미리 만들지 못한 연도는 조회할 때 만들어짐
+
+
+def _on_change(db_path, table, changes, version):
+    global _warm_running
+    if table != "transactions":
+        return
+    with _warm_lock:
+        _warm_pending.add(os.path.abspath(db_path))
+        if _warm_running:
+            return
+        _warm_running = True
+    threading.Thread(target=_warm_loop, daemon=True).start()
+
+
+store.add_listener(_on_change)
@@ -0,0 +1,214 @@
+# accounting_import.py
+# -------------------------
+# 은행/카드 거래내역(CSV, xlsx) 일괄 가져오기
+# - 파일을 CHUNK_SIZE 행 단위로 읽으면서 계좌/카드/항목/입력자 검증
+# - (날짜, 금액, 계좌, 카드, 메모) 해시로 기존 거래와 중복 제거
+# - 통과한 행은 하나의 트랜잭션으로 저장
+# -------------------------
+
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import pandas as pd
+
+import accounting_store as store
+
+CHUNK_SIZE = 10000
+
+# 가져올 거래 컬럼 (파일 컬럼과 연결)
+FIELDS = ["date", "type", "amount", "account", "card", "category", "memo"]
+REQUIRED_FIELDS = ["date", "amount"]
+TYPES = ["지출", "수입"]
+
+
+@dataclass
+class ImportResult:
+    """일괄 가져오기 결과"""
+    total: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    errors: list = field(default_factory=list)  # (행 번호, 사유)
+
+
+# -------------------------
+# 파일 읽기 (chunk 단위)
+# -------------------------
+def _file_kind(source):
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    ext = os.path.splitext(name)[1].lower()
+    if ext not in (".csv", ".xlsx"):
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {name}")
+    return ext[1:]
+
+
+def _csv_encoding(source):
+    """UTF-8 로 읽히지 않으면 국내 은행 내보내기에 흔한 CP949 로 판단"""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            sample = f.read(65536)
+    else:
+        sample = source.read(65536)
+        source.seek(0)
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        if e.start < len(sample) - 3:  # 샘플 끝에서 잘린 글자는 무시
+            return "cp949"
+    return "utf-8-sig"
+
+
+def _iter_xlsx(source, chunksize):
+    import openpyxl
+
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h) if h is not None else f"column{i}" for i, h in enumerate(next(rows, []))]
+        chunk, start = [], 0
+        for row in rows:
+            chunk.append(row[:len(header)])
+            if len(chunk) == chunksize:
+                yield pd.DataFrame(chunk, columns=header, index=range(start, start + len(chunk)))
+                chunk, start = [], start + len(chunk)
+        if chunk:
+            yield pd.DataFrame(chunk, columns=header, index=range(start, start + len(chunk)))
+    finally:
+        wb.close()
+
+
+def iter_chunks(source, chunksize=CHUNK_SIZE):
+    """파일 경로 또는 업로드 파일 객체에서 DataFrame 을 chunksize 행씩 읽기"""
+    if _file_kind(source) == "csv":
+        encoding = _csv_encoding(source)
+        with pd.read_csv(source, encoding=encoding, chunksize=chunksize, dtype=str) as reader:
+            yield from reader
+    else:
+        yield from _iter_xlsx(source, chunksize)
+
+
+def read_header(source):
+    """파일의 컬럼 목록"""
+    chunks = iter_chunks(source, chunksize=1)
+    try:
+        first = next(chunks, None)
+    finally:
+        chunks.close()
+        if not isinstance(source, str):
+            source.seek(0)
+    return [] if first is None else list(first.columns)
+
+
+def guess_mapping(columns):
+    """파일 컬럼 중 거래 컬럼과 이름이 같은 것을 자동 연결"""
+    return {f: (f if f in columns else None) for f in FIELDS}
+
+
+# -------------------------
+# 검증 / 중복 키
+# -------------------------
+def _text_column(values):
+    """빈 값은 "" 인 문자열 컬럼 (category 컬럼도 같은 해시가 나오도록 일반 문자열로)"""
+    return values.astype(object).fillna("").astype(str)
+
+
+def dedup_keys(df):
+    """(날짜(일), 금액, 계좌, 카드, 메모) 행별 64bit 해시"""
+    keys = pd.DataFrame({
+        "date": pd.to_datetime(df["date"], errors="coerce").dt.normalize(),
+        "amount": pd.to_numeric(df["amount"], errors="coerce").fillna(0).round().astype("int64"),
+        "account": _text_column(df["account"]),
+        "card": _text_column(df["card"]),
+        "memo": _text_column(df["memo"]),
+    })
+    return pd.util.hash_pandas_object(keys, index=False)
+
+
+def normalize_chunk(chunk, mapping, default_type=None):
+    """파일 chunk 를 거래 컬럼으로 바꾸고 (정상 행 DataFrame, 오류 사유 Series) 반환
+
+    default_type 이 None 이고 유형 컬럼이 없으면 금액 부호로 판단 (음수 = 지출)
+    """
+    out = pd.DataFrame(index=chunk.index)
+    for f in FIELDS:
+        col = mapping.get(f)
+        out[f] = chunk[col] if col else ""
+    for f in ["type", "account", "card", "category", "memo"]:
+        out[f] = out[f].fillna("").astype(str).str.strip()
+
+    out["date"] = pd.to_datetime(out["date"], errors="coerce")
+    amount = pd.to_numeric(out["amount"].astype(str).str.replace(",", "").str.strip(), errors="coerce")
+    if not mapping.get("type"):
+        out["type"] = default_type if default_type else amount.lt(0).map({True: "지출", False: "수입"})
+    out["amount"] = amount.abs()
+
+    reason = pd.Series("", index=out.index)
+    reason = reason.mask(reason.eq("") & out["date"].isna(), "날짜 오류")
+    reason = reason.mask(reason.eq("") & out["amount"].isna(), "금액 오류")
+    reason = reason.mask(reason.eq("") & ~out["type"].isin(TYPES), "유형 오류")
+    return out, reason
+
+
+def validate(rows, reason, data):
+    """계좌/카드/항목이 등록된 값인지 확인해 reason 에 사유 추가"""
+    accounts = set(data["accounts"]["account_name"]) | {""}
+    cards = set(data["cards"]["card_name"]) | {""}
+    categories = data["categories"]
+    valid_category = pd.Series(False, index=rows.index)
+    for type_ in TYPES:
+        names = set(categories.loc[categories["type"] == type_, "category_name"]) | {""}
+        valid_category |= rows["type"].eq(type_) & rows["category"].isin(names)
+
+    reason = reason.mask(reason.eq("") & ~rows["account"].isin(accounts), "등록되지 않은 계좌")
+    reason = reason.mask(reason.eq("") & ~rows["card"].isin(cards), "등록되지 않은 카드")
+    reason = reason.mask(reason.eq("") & ~valid_category, "등록되지 않은 항목")
+    return reason
+
+
+# -------------------------
+# 가져오기
+# -------------------------
+def import_statement(source, mapping, created_by, default_type=None,
+                     chunksize=CHUNK_SIZE, db_path=store.DB_FILE, progress=None):
+    """거래내역 파일을 검증/중복 제거 후 한 번에 저장
+
+    progress(읽은 행 수) 가 주어지면 chunk 마다 호출
+    """
+    missing = [f for f in REQUIRED_FIELDS if not mapping.get(f)]
+    if missing:
+        raise ValueError(f"필수 컬럼이 연결되지 않았습니다: {', '.join(missing)}")
+
+    data = store.load_all(db_path)
+    if created_by not in set(data["users"]["name"]):
+        raise ValueError(f"등록되지 않은 입력자입니다: {created_by}")
+    existing = dedup_keys(data["transactions"]).unique()
+
+    result = ImportResult()
+    accepted = []
+    for chunk in iter_chunks(source, chunksize):
+        rows, reason = normalize_chunk(chunk, mapping, default_type)
+        reason = validate(rows, reason, data)
+
+        bad = reason.ne("")
+        # 파일 행 번호 (머리글 다음 줄이 2행)
+        result.errors.extend(zip((rows.index[bad] + 2).tolist(), reason[bad].tolist()))
+
+        rows = rows[~bad]
+        duplicate = dedup_keys(rows).isin(existing)
+        result.duplicates += int(duplicate.sum())
+        accepted.append(rows[~duplicate])
+
+        result.total += len(chunk)
+        if progress is not None:
+            progress(result.total)
+    if not isinstance(source, str):
+        source.seek(0)
+
+    new = pd.concat(accepted, ignore_index=True) if accepted else pd.DataFrame(columns=FIELDS)
+    new["amount"] = new["amount"].round().astype("int64")
+    new.insert(0, "id", [str(uuid.uuid4()) for _ in range(len(new))])
+    new["created_by"] = created_by
+    new["created_at"] = datetime.now()
+    result.inserted = store.insert_rows("transactions", new, db_path)
+    return result
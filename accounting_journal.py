@@ -0,0 +1,169 @@
+# accounting_journal.py
+# -------------------------
+# accounting.py 변경 저널 (append-only JSON Lines)
+# - DB 옆 accounting_changelog/ 폴더에 저장
+# - 커밋된 쓰기마다 한 줄 {"ts", "table", "version", "op", "changes"} 를 추가하고 fsync
+# - 저장소는 마지막 스냅샷/캐시 이후의 저널을 다시 적용(replay)해 테이블을 최신으로 만듦
+# - 압축(compaction) 후의 저널은 archive/ 에 gzip 으로 보관 (변경 기록)
+# -------------------------
+
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+ACTIVE_FILE = "journal.jsonl"
+ARCHIVE_DIR = "archive"
+
+_lock = threading.Lock()
+_readers = {}  # 저널 파일 경로 -> (inode, 읽은 위치, 항목 목록)
+
+
+def journal_dir(db_path):
+    base = os.path.splitext(os.path.abspath(db_path))[0]
+    return base + "_changelog"
+
+
+def _active_path(db_path):
+    return os.path.join(journal_dir(db_path), ACTIVE_FILE)
+
+
+def _op(changes):
+    if changes is None:
+        return "replace"
+    old, new = changes[0]
+    return "insert" if old is None else "delete" if new is None else "update"
+
+
+# -------------------------
+# 쓰기
+# -------------------------
+def append(db_path, table, version, changes):
+    """변경 한 건(= 테이블 버전 하나)을 저널에 추가하고 디스크에 기록될 때까지 기다림
+
+    changes 가 None(전체 교체)이면 행 내용 없이 기록되고 다시 적용할 수 없음
+    """
+    entry = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "table": table,
+        "version": version,
+        "op": _op(changes),
+        "changes": changes,
+    }
+    line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    os.makedirs(journal_dir(db_path), exist_ok=True)
+    with _lock:
+        # 한 번의 write 로 추가해 다른 프로세스의 줄과 섞이지 않게 함
+        fd = os.open(_active_path(db_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def size(db_path):
+    """현재 저널 파일 크기 (바이트)"""
+    try:
+        return os.path.getsize(_active_path(db_path))
+    except OSError:
+        return 0
+
+
+# -------------------------
+# 읽기
+# -------------------------
+def _read_file(path):
+    """저널 파일의 항목 목록 (이미 읽은 부분은 다시 파싱하지 않음)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _readers.pop(path, None)
+        return []
+    with _lock:
+        inode, offset, entries = _readers.get(path, (None, 0, []))
+        if inode != stat.st_ino or stat.st_size < offset:
+            offset, entries = 0, []
+        if stat.st_size > offset:
+            entries = list(entries)
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            # 마지막 줄이 아직 쓰는 중이면 다음에 읽음
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                if line.strip():
+                    entries.append(json.loads(line))
+            offset += end
+        _readers[path] = (stat.st_ino, offset, entries)
+        return entries
+
+
+def entries(db_path):
+    """아직 압축되지 않은 저널 항목 (압축 중이던 구간 포함)"""
+    directory = journal_dir(db_path)
+    if not os.path.isdir(directory):
+        return []
+    result = []
+    # 압축 중이던 구간 파일이 현재 저널보다 앞선 기록
+    for name in sorted(os.listdir(directory), key=lambda n: (n == ACTIVE_FILE, n)):
+        if name.endswith(".jsonl"):
+            result.extend(_read_file(os.path.join(directory, name)))
+    return result
+
+
+def changes_between(db_path, table, start, end):
+    """table 의 (start, end] 버전 변경 목록을 버전 순서로 반환
+
+    중간 버전이 빠졌거나 전체 교체가 있으면 다시 적용할 수 없으므로 None
+    """
+    by_version = {e["version"]: e["changes"] for e in entries(db_path) if e["table"] == table}
+    result = []
+    for version in range(start + 1, end + 1):
+        changes = by_version.get(version)
+        if changes is None:
+            return None
+        result.append(changes)
+    return result
+
+
+def iter_history(db_path):
+    """보관된 저널부터 현재 저널까지 모든 항목 (오래된 순)"""
+    archive = os.path.join(journal_dir(db_path), ARCHIVE_DIR)
+    if os.path.isdir(archive):
+        for name in sorted(os.listdir(archive)):
+            with gzip.open(os.path.join(archive, name), "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+    yield from entries(db_path)
+
+
+# -------------------------
+# 압축 (저장소가 스냅샷을 새로 쓴 뒤 보관)
+# -------------------------
+def rotate(db_path):
+    """현재 저널을 구간 파일로 바꾸고 그 경로 반환 (이후 쓰기는 새 파일로, 저널이 없으면 None)"""
+    segment = os.path.join(journal_dir(db_path), f"segment-{time.time_ns()}.jsonl")
+    with _lock:
+        try:
+            os.replace(_active_path(db_path), segment)
+        except FileNotFoundError:
+            return None
+    return segment
+
+
+def archive(segment):
+    """압축이 끝난 구간 파일을 archive/ 에 gzip 으로 옮김"""
+    directory = os.path.join(os.path.dirname(segment), ARCHIVE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, os.path.basename(segment) + ".gz")
+    with open(segment, "rb") as src, gzip.open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(segment)
+    with _lock:
+        _readers.pop(segment, None)
+    return target
@@ -0,0 +1,121 @@
+# accounting_profile.py
+# -------------------------
+# accounting.py 처리 시간 측정
+# - 실행(rerun) 하나를 run() 으로 감싸면 그 안에서 호출된 단계별 시간을 모아 기록
+#   load: 테이블/엑셀 읽기, backfill: id 채우기, aggregate: 집계/조회, chart: 차트 생성, save: DB/엑셀 쓰기
+# - 단계 안에서 다른 단계를 호출하면 안쪽 시간은 안쪽 단계에만 더함 (합계가 실행 시간을 넘지 않음)
+# - 최근 HISTORY_SIZE 번의 실행 기록을 보관하고 DataFrame/CSV 로 내보냄 (데이터가 늘 때 느려지는지 확인)
+# - run() 밖(백그라운드 스레드 등)에서는 시간을 재지 않음
+# -------------------------
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+STAGES = ["load", "backfill", "aggregate", "chart", "save"]
+
+HISTORY_SIZE = 500
+
+_local = threading.local()
+_history = deque(maxlen=HISTORY_SIZE)
+_history_lock = threading.Lock()
+
+
+@contextmanager
+def run(label):
+    """label 실행 한 번의 단계별 시간을 기록 (기록 dict 를 넘겨줌, 이미 실행 중이면 바깥 실행에 합침)"""
+    if getattr(_local, "record", None) is not None:
+        yield _local.record
+        return
+    record = {"ts": datetime.now().isoformat(timespec="seconds"), "run": label, "rows": None}
+    record.update({f"{stage}_ms": 0.0 for stage in STAGES})
+    _local.record = record
+    _local.stack = []
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["total_ms"] = (time.perf_counter() - start) * 1000
+        record["other_ms"] = record["total_ms"] - sum(record[f"{stage}_ms"] for stage in STAGES)
+        _local.record = None
+        with _history_lock:
+            _history.append(record)
+
+
+@contextmanager
+def stage(name):
+    """name 단계 시간 측정 (run() 안에서만)"""
+    record = getattr(_local, "record", None)
+    if record is None:
+        yield
+        return
+    stack = _local.stack
+    stack.append(0.0)  # 안쪽 단계가 쓴 시간
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        inner = stack.pop()
+        record[f"{name}_ms"] += elapsed - inner
+        if stack:
+            stack[-1] += elapsed
+
+
+def timed(name):
+    """함수 호출 시간을 name 단계로 측정하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "record", None) is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def note(**values):
+    """현재 실행 기록에 값 추가 (예: rows=거래 수)"""
+    record = getattr(_local, "record", None)
+    if record is not None:
+        record.update(values)
+
+
+# -------------------------
+# 기록 조회
+# -------------------------
+COLUMNS = ["ts", "run", "rows", "total_ms"] + [f"{stage}_ms" for stage in STAGES] + ["other_ms"]
+
+
+def history():
+    """최근 실행 기록 DataFrame (오래된 순)"""
+    with _history_lock:
+        rows = list(_history)
+    return pd.DataFrame(rows, columns=COLUMNS).round(1)
+
+
+def summary():
+    """실행(label)별 단계 시간 평균/p95 (ms)"""
+    df = history()
+    columns = ["total_ms"] + [f"{stage}_ms" for stage in STAGES]
+    if df.empty:
+        return pd.DataFrame(columns=["run", "count"] + columns)
+    grouped = df.groupby("run")[columns]
+    result = grouped.mean().add_suffix(" 평균").join(grouped.quantile(0.95).add_suffix(" p95"))
+    result.insert(0, "count", df.groupby("run").size())
+    return result.round(1).reset_index()
+
+
+def history_csv():
+    return history().to_csv(index=False).encode("utf-8-sig")
+
+
+def clear():
+    with _history_lock:
+        _history.clear()
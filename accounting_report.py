@@ -0,0 +1,113 @@
+# accounting_report.py
+# -------------------------
+# 기간별 보고서 내보내기
+# - 거래 행은 DB 에서 조금씩 읽어 바로 파일에 씀 (xlsxwriter constant_memory 또는 CSV)
+# - 요약 시트는 집계 큐브에서 조회
+# -------------------------
+
+import csv
+from datetime import datetime
+
+import pandas as pd
+
+import accounting_analytics as analytics
+import accounting_store as store
+
+# 엑셀 시트 하나의 최대 행 수 (머리글 제외)
+MAX_SHEET_ROWS = 1048575
+
+# 요약 시트: (시트 이름, 기준 컬럼, 유형)
+SUMMARY_SHEETS = [
+    ("카드별 지출", "card", "지출"),
+    ("계좌별 수입", "account", "수입"),
+    ("계좌별 지출", "account", "지출"),
+    ("항목별 지출", "category", "지출"),
+    ("항목별 수입", "category", "수입"),
+]
+
+
+def month_range(start, end):
+    """(연, 월) start ~ end 를 [시작일, 다음 달 1일) 로 변환"""
+    first = pd.Timestamp(year=start[0], month=start[1], day=1)
+    last = pd.Timestamp(year=end[0], month=end[1], day=1) + pd.DateOffset(months=1)
+    return first, last
+
+
+def _parse_date(value):
+    # DATE_FORMAT("YYYY-MM-DD HH:MM:SS") 는 ISO 형식이라 strptime 보다 빠른 fromisoformat 사용
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def write_excel_report(path, start, end, db_path=store.DB_FILE, progress=None):
+    """(연, 월) start ~ end 기간 보고서를 엑셀 파일로 저장 (기록한 거래 수 반환)
+
+    constant_memory 모드는 행을 순서대로 쓰면 바로 디스크로 내보내므로
+    거래 수와 관계없이 메모리 사용량이 일정함
+    """
+    import xlsxwriter
+
+    first, last = month_range(start, end)
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        header_fmt = workbook.add_format({"bold": True})
+        date_fmt = workbook.add_format({"num_format": "yyyy-mm-dd hh:mm:ss"})
+        amount_fmt = workbook.add_format({"num_format": "#,##0"})
+
+        rows = store.iter_transactions(first, last, db_path)
+        columns = next(rows)
+        date_cols = {i for i, c in enumerate(columns) if c in store.DATE_COLUMNS}
+        amount_cols = {i for i, c in enumerate(columns) if c in store.INTEGER_COLUMNS}
+
+        # 거래 내역 (시트 최대 행 수를 넘으면 다음 시트로)
+        sheet, r, count = None, 0, 0
+        for row in rows:
+            if sheet is None or r > MAX_SHEET_ROWS:
+                sheet_no = count // MAX_SHEET_ROWS + 1
+                sheet = workbook.add_worksheet("거래 내역" if sheet_no == 1 else f"거래 내역 ({sheet_no})")
+                sheet.write_row(0, 0, columns, header_fmt)
+                r = 1
+            # 자료형별 write_* 를 직접 호출 (write() 의 형식 추측 비용이 행 수만큼 커짐)
+            for c, value in enumerate(row):
+                if value is None:
+                    continue
+                if c in date_cols:
+                    sheet.write_datetime(r, c, _parse_date(value), date_fmt)
+                elif c in amount_cols:
+                    sheet.write_number(r, c, value, amount_fmt)
+                elif isinstance(value, str):
+                    sheet.write_string(r, c, value)
+                else:
+                    sheet.write_number(r, c, value)
+            r += 1
+            count += 1
+            if progress is not None and count % 10000 == 0:
+                progress(count)
+        if sheet is None:
+            workbook.add_worksheet("거래 내역").write_row(0, 0, columns, header_fmt)
+
+        # 요약 (큐브 조회)
+        cube = analytics.get_cube(db_path)
+        for name, by, type_ in SUMMARY_SHEETS:
+            summary = cube.sum_by_months(by, start, end, type=type_)
+            ws = workbook.add_worksheet(name)
+            ws.write_row(0, 0, [by, "amount"], header_fmt)
+            for i, (key, amount) in enumerate(zip(summary[by], summary["amount"]), start=1):
+                ws.write(i, 0, key)
+                ws.write(i, 1, int(amount), amount_fmt)
+    finally:
+        workbook.close()
+    return count
+
+
+def write_csv_report(path, start, end, db_path=store.DB_FILE, progress=None):
+    """(연, 월) start ~ end 기간 거래를 CSV 로 저장 (엑셀에서 바로 열리도록 UTF-8 BOM)"""
+    first, last = month_range(start, end)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8-sig", buffering=1024 * 1024) as f:
+        writer = csv.writer(f)
+        for row in store.iter_transactions(first, last, db_path):
+            writer.writerow(row)
+            count += 1
+            if progress is not None and count % 10000 == 0:
+                progress(count)
+    return count - 1  # 머리글 제외
@@ -0,0 +1,830 @@
+# accounting_store.py
+# -------------------------
+# accounting.py 저장소
+# - 실제 데이터는 SQLite 파일(accounting.db)에 보관하고 행 단위로 INSERT/UPDATE/DELETE
+# - accounting.xlsx 는 가져오기/내보내기(교환) 형식으로만 사용
+# - 테이블별 Parquet 스냅샷(accounting_snapshot/)으로 앱 첫 실행(콜드 스타트) 시 읽기를 줄임
+# - 모든 쓰기는 변경 저널(accounting_changelog/)에도 기록되어, 스냅샷/캐시 이후의 변경만 다시 적용
+# -------------------------
+
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import closing, contextmanager
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+import accounting_journal as journal
+import accounting_profile as profile
+
+DB_FILE = "accounting.db"
+XLSX_FILE = "accounting.xlsx"
+
+# 테이블(= 엑셀 시트) 목록과 행을 식별하는 키 컬럼
+TABLES = {
+    "transactions": "id",
+    "accounts": "account_name",
+    "cards": "card_name",
+    "categories": "category_name",
+    "users": "name",
+}
+
+# 정수로 저장하는 컬럼
+INTEGER_COLUMNS = {"amount"}
+# 날짜/시간으로 저장하는 컬럼 (항상 같은 형식의 문자열로 저장)
+DATE_COLUMNS = {"date", "created_at"}
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 거래 행 버전 컬럼 (수정/삭제할 때 읽은 뒤 다른 세션이 바꿨는지 확인)
+REV_COLUMN = "_rev"
+
+# 이보다 많은 행을 한 번에 추가하면 변경 알림 대신 전체 교체로 알림
+BULK_NOTIFY_LIMIT = 1000
+
+# 저널이 이 크기(바이트)를 넘으면 백그라운드에서 스냅샷을 새로 쓰고 저널을 보관
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+
+
+# -------------------------
+# 읽기/쓰기 횟수 집계
+# - 세션마다 Counter 를 track_io() 로 등록하면 해당 스레드의 DB 읽기/쓰기가 집계됨
+#   read: 테이블 읽기, snapshot: 스냅샷 읽기, replay: 저널 적용, write: 커밋된 쓰기, skip: 변경이 없어 건너뛴 쓰기
+# -------------------------
+_local = threading.local()
+
+
+def track_io(counter):
+    _local.counter = counter
+
+
+def _count_io(kind):
+    counter = getattr(_local, "counter", None)
+    if counter is not None:
+        counter[kind] += 1
+
+
+# -------------------------
+# 변경 알림
+# - listener(db_path, table, changes, version) 형태로 커밋 직후 호출
+# - changes: [(이전 행 dict 또는 None, 새 행 dict 또는 None), ...]
+#   (입력은 이전 행이 None, 삭제는 새 행이 None, 전체 교체(가져오기)는 changes 자체가 None)
+# - version: 이 쓰기로 올라간 테이블 버전
+# -------------------------
+_listeners = []
+
+
+def add_listener(listener):
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _notify(db_path, table, changes, version):
+    for listener in _listeners:
+        listener(db_path, table, changes, version)
+
+
+# -------------------------
+# 엑셀 (가져오기/내보내기 형식)
+# -------------------------
+@profile.timed("load")
+def load_excel(path=XLSX_FILE):
+    xls = pd.ExcelFile(path)
+    return {table: pd.read_excel(xls, table) for table in TABLES}
+
+
+@profile.timed("save")
+def save_excel(data, path=XLSX_FILE):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for sheet, df in data.items():
+            df.to_excel(writer, sheet_name=sheet, index=False)
+
+
+# -------------------------
+# SQLite 연결
+# -------------------------
+def connect(db_path=DB_FILE):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ConflictError(Exception):
+    """다른 세션이 먼저 수정/삭제한 행을 고치려고 할 때"""
+
+
+@contextmanager
+def transaction(db_path=DB_FILE):
+    """하나의 쓰기 트랜잭션으로 묶어 실행 (예외 시 롤백)
+
+    BEGIN IMMEDIATE 로 시작부터 쓰기 잠금을 잡으므로 트랜잭션 안에서 읽은 값은
+    커밋할 때까지 다른 세션이 바꿀 수 없음 (잠금은 timeout 동안 기다림)
+    """
+    with profile.stage("save"), closing(connect(db_path)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            yield conn
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _to_sql(column, value):
+    """DataFrame/위젯 값을 SQLite 에 저장할 값으로 변환"""
+    if value is None:
+        return None
+    if not isinstance(value, (list, tuple, dict)) and pd.isna(value):
+        return None
+    if column in DATE_COLUMNS:
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        ts = pd.to_datetime(value, errors="coerce")
+        return None if pd.isna(ts) else ts.strftime(DATE_FORMAT)
+    if column in INTEGER_COLUMNS:
+        return int(value)
+    if hasattr(value, "item"):  # numpy 스칼라
+        return value.item()
+    return value
+
+
+def _from_sql(table, df):
+    """SQLite 에서 읽은 DataFrame 의 날짜 컬럼 복원"""
+    for col in DATE_COLUMNS & set(df.columns):
+        df[col] = pd.to_datetime(df[col], format=DATE_FORMAT, errors="coerce")
+    return df
+
+
+# -------------------------
+# 거래 테이블 메모리 표현
+# - 반복 값이 많은 문자열 컬럼은 category (빈 값은 "")
+# - 금액은 int64 (빈 값은 0), 날짜는 datetime64
+# - 연/월 컬럼(DERIVED_COLUMNS)을 미리 계산해 둠 (날짜가 없으면 0)
+# - 캐시/스냅샷/집계/화면이 모두 이 형태를 그대로 사용
+# -------------------------
+CATEGORY_COLUMNS = {"type", "category", "account", "card", "created_by"}
+DERIVED_COLUMNS = ["year", "month"]
+
+
+def compact_transactions(df):
+    """거래 DataFrame 을 위 표현으로 변환 (이미 변환된 DataFrame 은 그대로)"""
+    for col in CATEGORY_COLUMNS & set(df.columns):
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if not values.hasnans:
+                continue
+            values = values.astype(object)
+        df[col] = values.fillna("").astype("category")
+    for col in INTEGER_COLUMNS & set(df.columns):
+        if df[col].dtype != "int64":
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).round().astype("int64")
+    for col in DATE_COLUMNS & set(df.columns):
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    if "date" in df.columns:
+        df["year"] = df["date"].dt.year.fillna(0).astype("int16")
+        df["month"] = df["date"].dt.month.fillna(0).astype("int8")
+    return df
+
+
+def _table_frame(table, df):
+    """SQLite/스냅샷에서 읽은 DataFrame 을 앱에서 쓰는 형태로"""
+    return compact_transactions(df) if table == "transactions" else df
+
+
+def exchange_columns(columns):
+    """엑셀 등 교환 형식으로 쓸 컬럼 (미리 계산한 연/월, 행 버전 제외)"""
+    return [c for c in columns if c not in DERIVED_COLUMNS and c != REV_COLUMN]
+
+
+def exchange_frame(table, df):
+    """exchange_columns 만 남긴 DataFrame"""
+    columns = exchange_columns(df.columns)
+    return df[columns] if len(columns) < len(df.columns) else df
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({_quote(table)})")]
+
+
+def _create_table(conn, table, columns):
+    defs = []
+    for col in columns:
+        ctype = "INTEGER" if col in INTEGER_COLUMNS else "TEXT"
+        defs.append(f"{_quote(col)} {ctype}")
+    conn.execute(f"CREATE TABLE {_quote(table)} ({', '.join(defs)})")
+    key = TABLES[table]
+    if key in columns:
+        conn.execute(f"CREATE INDEX {_quote('idx_' + table + '_' + key)} ON {_quote(table)} ({_quote(key)})")
+
+
+def _sql_column(column, series):
+    """DataFrame 컬럼 전체를 SQLite 값 목록으로 변환 (_to_sql 의 일괄 처리판)"""
+    if column in DATE_COLUMNS:
+        series = pd.to_datetime(series, errors="coerce").dt.strftime(DATE_FORMAT)
+    elif column in INTEGER_COLUMNS:
+        series = pd.to_numeric(series, errors="coerce").round().astype("Int64")
+    series = series.astype(object)
+    return series.where(series.notna(), None).tolist()
+
+
+def _insert_frame(conn, table, df):
+    columns = list(df.columns)
+    placeholders = ", ".join("?" for _ in columns)
+    sql = f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})"
+    conn.executemany(sql, zip(*[_sql_column(col, df[col]) for col in columns]))
+
+
+# -------------------------
+# 가져오기 / 내보내기
+# -------------------------
+def import_excel(path=XLSX_FILE, db_path=DB_FILE):
+    """엑셀 통합문서 전체를 DB 로 가져오기 (기존 테이블은 교체)"""
+    import_frames(load_excel(path), db_path)
+
+
+def import_frames(data, db_path=DB_FILE):
+    """{테이블: DataFrame} 전체를 DB 로 가져오기 (기존 테이블은 교체)"""
+    # 이전 데이터의 저널은 다시 적용할 일이 없으므로 보관만 함
+    segment = journal.rotate(db_path)
+    if segment is not None:
+        journal.archive(segment)
+    with transaction(db_path) as conn:
+        for table, df in data.items():
+            df = exchange_frame(table, df)
+            conn.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+            _create_table(conn, table, list(df.columns))
+            _insert_frame(conn, table, df)
+        # 새 데이터이므로 마이그레이션을 처음부터 다시 적용
+        conn.execute("PRAGMA user_version = 0")
+    _invalidate(db_path)
+    _count_io("write")
+    migrate(db_path)
+    with transaction(db_path) as conn:
+        versions = {table: _bump_version(conn, table) for table in TABLES}
+        _mark_exported(conn)
+    for table, version in versions.items():
+        _notify(db_path, table, None, version)
+
+
+def export_excel(path=XLSX_FILE, db_path=DB_FILE, force=False):
+    """DB 전체를 엑셀 통합문서로 내보내기 (변경이 없으면 건너뛰고 False 반환)"""
+    if not force and os.path.exists(path) and not dirty_tables(db_path):
+        _count_io("skip")
+        return False
+    data = load_all(db_path)
+    save_excel({table: exchange_frame(table, df) for table, df in data.items()}, path)
+    with transaction(db_path) as conn:
+        _mark_exported(conn)
+    return True
+
+
+def ensure_database(db_path=DB_FILE, xlsx_path=XLSX_FILE):
+    """DB 가 없으면 엑셀에서 최초 1회 가져오고, 남은 마이그레이션 적용"""
+    if not os.path.exists(db_path):
+        import_excel(xlsx_path, db_path)
+    migrate(db_path)
+
+
+# -------------------------
+# 마이그레이션 (PRAGMA user_version 으로 적용 여부 기록, 각 단계는 1회만 실행)
+# -------------------------
+@profile.timed("backfill")
+def _migrate_backfill_ids(conn):
+    """id 가 비어 있는 거래에 UUID 채우기"""
+    if "id" not in table_columns(conn, "transactions"):
+        conn.execute('ALTER TABLE transactions ADD COLUMN "id" TEXT')
+    rowids = [r[0] for r in conn.execute(
+        "SELECT rowid FROM transactions WHERE id IS NULL OR id = ''"
+    )]
+    conn.executemany(
+        "UPDATE transactions SET id = ? WHERE rowid = ?",
+        [(str(uuid.uuid4()), rowid) for rowid in rowids],
+    )
+
+
+def _migrate_versions(conn):
+    """테이블별 변경 버전 (version: 쓰기마다 증가, exported_version: 마지막 엑셀 내보내기 시점)"""
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS _versions "
+        "(name TEXT PRIMARY KEY, version INTEGER NOT NULL, exported_version INTEGER NOT NULL)"
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO _versions VALUES (?, 0, 0)",
+        [(table,) for table in TABLES],
+    )
+
+
+def _migrate_date_index(conn):
+    """기간 조회(보고서)용 날짜 인덱스"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date)")
+
+
+def _migrate_meta(conn):
+    """DB 고유 ID (스냅샷이 이 DB 의 것인지 확인하는 데 사용)"""
+    conn.execute("CREATE TABLE IF NOT EXISTS _meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("INSERT OR IGNORE INTO _meta VALUES ('db_id', ?)", (uuid.uuid4().hex,))
+
+
+def _migrate_row_versions(conn):
+    """거래 행 버전 컬럼 (수정/삭제마다 1 씩 증가)"""
+    if REV_COLUMN not in table_columns(conn, "transactions"):
+        conn.execute(f"ALTER TABLE transactions ADD COLUMN {_quote(REV_COLUMN)} INTEGER NOT NULL DEFAULT 0")
+
+
+MIGRATIONS = [
+    _migrate_backfill_ids,
+    _migrate_versions,
+    _migrate_date_index,
+    _migrate_meta,
+    _migrate_row_versions,
+]
+
+
+def migrate(db_path=DB_FILE):
+    """아직 적용되지 않은 마이그레이션만 실행 (적용한 단계 수 반환)"""
+    with transaction(db_path) as conn:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        pending = MIGRATIONS[current:]
+        for step in pending:
+            step(conn)
+        if pending:
+            conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+            # 테이블 구조/내용이 바뀌었을 수 있으므로 캐시/스냅샷/집계를 모두 새로 만들게 함
+            versions = {table: _bump_version(conn, table) for table in TABLES}
+    if pending:
+        _count_io("write")
+        for table, version in versions.items():
+            _notify(db_path, table, None, version)
+    return len(pending)
+
+
+# -------------------------
+# 변경 추적
+# -------------------------
+def _bump_version(conn, table):
+    """테이블 버전을 올리고 새 버전을 반환"""
+    conn.execute("UPDATE _versions SET version = version + 1 WHERE name = ?", (table,))
+    return conn.execute("SELECT version FROM _versions WHERE name = ?", (table,)).fetchone()[0]
+
+
+def _mark_exported(conn):
+    conn.execute("UPDATE _versions SET exported_version = version")
+
+
+def table_versions(db_path=DB_FILE):
+    with closing(connect(db_path)) as conn:
+        return dict(conn.execute("SELECT name, version FROM _versions"))
+
+
+def dirty_tables(db_path=DB_FILE):
+    """마지막 엑셀 내보내기 이후 변경된 테이블 목록"""
+    with closing(connect(db_path)) as conn:
+        return [r[0] for r in conn.execute(
+            "SELECT name FROM _versions WHERE version != exported_version"
+        )]
+
+
+# -------------------------
+# Parquet 스냅샷
+# - 파일 이름에 (DB ID, 테이블 버전)을 넣어 둠
+# - 현재 버전보다 오래된 스냅샷은 그 이후의 변경을 저널에서 다시 적용해 사용
+# - 적용할 수 없으면 SQLite 에서 읽고, 백그라운드 스레드에서 새 스냅샷 저장
+# - pyarrow 가 없으면 스냅샷 없이 동작
+# -------------------------
+def snapshot_dir(db_path=DB_FILE):
+    base = os.path.splitext(os.path.abspath(db_path))[0]
+    return base + "_snapshot"
+
+
+def _snapshot_path(db_path, table, db_id, version):
+    return os.path.join(snapshot_dir(db_path), f"{table}-{db_id}-{version}.parquet")
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_snapshot(table, df, db_id, version, db_path=DB_FILE):
+    """테이블 스냅샷 저장 후 같은 테이블의 이전 스냅샷 삭제 (pyarrow 가 없으면 False)
+
+    더 새 버전의 스냅샷이 먼저 저장되어 있으면 그것을 남기고 이번 스냅샷을 지움
+    (백그라운드 저장이 늦게 끝나도 최신 스냅샷을 지우지 않음)
+    """
+    if not _has_pyarrow():
+        return False
+    path = _snapshot_path(db_path, table, db_id, version)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # 프로세스/스레드마다 다른 임시 파일
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    directory = os.path.dirname(path)
+    prefix = f"{table}-{db_id}-"
+    stale = []
+    for name in os.listdir(directory):
+        if not (name.startswith(table + "-") and name.endswith(".parquet")) or name == os.path.basename(path):
+            continue
+        other = name[len(prefix):-len(".parquet")] if name.startswith(prefix) else ""
+        if other.isdigit() and int(other) > version:
+            stale = [os.path.basename(path)]
+            break
+        stale.append(name)
+    for name in stale:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass  # 다른 프로세스가 먼저 지운 경우
+    return True
+
+
+def latest_snapshot_version(table, db_id, max_version, db_path=DB_FILE):
+    """max_version 이하인 가장 최근 스냅샷 버전 (없으면 None)"""
+    directory = snapshot_dir(db_path)
+    if not os.path.isdir(directory):
+        return None
+    prefix = f"{table}-{db_id}-"
+    versions = []
+    for name in os.listdir(directory):
+        if name.startswith(prefix) and name.endswith(".parquet"):
+            version = name[len(prefix):-len(".parquet")]
+            if version.isdigit() and int(version) <= max_version:
+                versions.append(int(version))
+    return max(versions, default=None)
+
+
+def read_snapshot(table, db_id, version, db_path=DB_FILE):
+    """현재 버전의 스냅샷이 있으면 DataFrame, 없으면 None"""
+    path = _snapshot_path(db_path, table, db_id, version)
+    if not os.path.exists(path) or not _has_pyarrow():
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except (OSError, ValueError):
+        return None  # 저장 중 잘린 파일 등은 SQLite 에서 다시 읽음
+    _count_io("snapshot")
+    return _table_frame(table, df)
+
+
+def _save_snapshot_later(db_path, table, db_id, version, df):
+    if db_id is None or not _has_pyarrow():
+        return
+    threading.Thread(
+        target=write_snapshot, args=(table, df, db_id, version, db_path), daemon=True
+    ).start()
+
+
+# -------------------------
+# 읽기 (테이블별 캐시)
+# - 테이블 버전(_versions)이 그대로면 다시 읽지 않고 캐시된 DataFrame 을 사용
+# - 버전이 올라갔으면 캐시 이후의 변경을 저널에서 적용하고, 안 되면 그 테이블만 다시 읽음
+# - 다른 세션/프로세스의 쓰기도 버전으로 감지됨
+# -------------------------
+_cache = {}  # (db 경로, 테이블) -> (버전, DataFrame)
+_cache_lock = threading.Lock()
+
+
+def _cache_key(db_path, table):
+    return (os.path.abspath(db_path), table)
+
+
+def _invalidate(db_path, tables=TABLES):
+    with _cache_lock:
+        for table in tables:
+            _cache.pop(_cache_key(db_path, table), None)
+
+
+def _read_table(conn, table):
+    df = pd.read_sql_query(f"SELECT * FROM {_quote(table)} ORDER BY rowid", conn)
+    _count_io("read")
+    return _table_frame(table, _from_sql(table, df))
+
+
+# -------------------------
+# 저널 다시 적용 (replay)
+# - 저널의 변경 행(SQLite 값)을 같은 자료형의 DataFrame 으로 바꿔 삭제/수정/추가
+# - 행 순서는 SQLite 의 rowid 순서와 같게 유지 (수정은 제자리, 추가는 끝)
+# -------------------------
+def _rows_frame(table, rows):
+    df = pd.DataFrame(rows).drop(columns=["rowid"], errors="ignore")
+    return _table_frame(table, _from_sql(table, df))
+
+
+def _align_categories(df, rows):
+    """rows 의 category 컬럼을 df 와 같은 범주로 맞춤 (df 에 없는 값은 범주에 추가)"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            values = rows[col].astype(object)
+            new = pd.Index(values.unique()).difference(df[col].cat.categories)
+            if len(new):
+                df[col] = df[col].cat.add_categories(new)
+            rows[col] = pd.Categorical(values, categories=df[col].cat.categories)
+
+
+def _apply_changes(table, df, changes):
+    """변경 한 건을 적용한 새 DataFrame (열 구성이 다르면 None)"""
+    key = TABLES[table]
+    deleted = [old[key] for old, new in changes if new is None]
+    if deleted:
+        df = df[~df[key].isin(deleted)]
+    rows = [new for _, new in changes if new is not None]
+    if rows:
+        rows = _rows_frame(table, rows)
+        if list(rows.columns) != list(df.columns):
+            return None
+        df = df.copy(deep=False)  # 바꾸는 컬럼만 복사됨 (copy-on-write)
+        _align_categories(df, rows)
+        updated = [old is not None and new is not None for old, new in changes if new is not None]
+        for i in np.flatnonzero(updated):
+            positions = np.flatnonzero((df[key] == rows[key].iat[i]).to_numpy())
+            for col in df.columns:
+                df.iloc[positions, df.columns.get_loc(col)] = rows[col].iat[i]
+        inserted = rows[~np.asarray(updated)]
+        if len(inserted):
+            df = pd.concat([df, inserted], ignore_index=True)
+    return df.reset_index(drop=True)
+
+
+def _replay(db_path, table, df, start, end):
+    """start 버전의 df 에 (start, end] 저널을 적용한 DataFrame (적용할 수 없으면 None)"""
+    if start is None or end is None or start > end:
+        return None
+    changes = journal.changes_between(db_path, table, start, end)
+    if changes is None:
+        return None
+    for entry in changes:
+        df = _apply_changes(table, df, entry)
+        if df is None:
+            return None
+    _count_io("replay")
+    return df
+
+
+def _db_id(conn):
+    try:
+        row = conn.execute("SELECT value FROM _meta WHERE key = 'db_id'").fetchone()
+    except sqlite3.OperationalError:
+        return None  # 마이그레이션 전
+    return row[0] if row else None
+
+
+@profile.timed("load")
+def _load(db_path, tables, copy=True):
+    result = {}
+    with closing(connect(db_path)) as conn:
+        # 버전과 데이터를 같은 스냅샷에서 읽기
+        conn.execute("BEGIN")
+        versions = dict(conn.execute("SELECT name, version FROM _versions"))
+        db_id = _db_id(conn)
+        for table in tables:
+            key = _cache_key(db_path, table)
+            with _cache_lock:
+                cached = _cache.get(key)
+            version = versions.get(table)
+            if cached is not None and cached[0] == version:
+                _count_io("hit")
+                df = cached[1]
+            else:
+                # 캐시(없으면 가장 최근 스냅샷) 이후의 변경만 저널에서 다시 적용
+                df = None
+                if cached is not None:
+                    df = _replay(db_path, table, cached[1], cached[0], version)
+                if df is None and db_id is not None and version is not None:
+                    base = latest_snapshot_version(table, db_id, version, db_path)
+                    if base is not None:
+                        df = read_snapshot(table, db_id, base, db_path)
+                        if df is not None and base != version:
+                            df = _replay(db_path, table, df, base, version)
+                if df is None:
+                    df = _read_table(conn, table)
+                    _save_snapshot_later(db_path, table, db_id, versions.get(table), df)
+                with _cache_lock:
+                    _cache[key] = (versions.get(table), df)
+            if table == "transactions":
+                profile.note(rows=len(df))
+            result[table] = df.copy() if copy else df
+        conn.rollback()
+    return versions, result
+
+
+def load_all(db_path=DB_FILE, tables=TABLES, copy=True):
+    """테이블 DataFrame 들을 반환 (반환값은 복사본이므로 수정해도 캐시에 영향 없음)
+
+    copy=False 면 캐시된 DataFrame 을 그대로 공유 (읽기 전용으로만 사용)
+    """
+    return _load(db_path, tables, copy)[1]
+
+
+def load_table(table, db_path=DB_FILE):
+    return load_all(db_path, [table])[table]
+
+
+def iter_transactions(start, end, db_path=DB_FILE, chunksize=5000):
+    """[start, end) 기간의 거래를 날짜순으로 한 행씩 반환 (전체를 메모리에 올리지 않음)
+
+    첫 번째 값은 컬럼 이름 목록 (exchange_columns), 이후는 행 tuple (날짜는 DATE_FORMAT 문자열)
+    """
+    with closing(connect(db_path)) as conn:
+        columns = ", ".join(_quote(c) for c in exchange_columns(table_columns(conn, "transactions")))
+        cur = conn.execute(
+            f"SELECT {columns} FROM transactions WHERE date >= ? AND date < ? ORDER BY date, rowid",
+            (_to_sql("date", start), _to_sql("date", end)),
+        )
+        _count_io("read")
+        yield [d[0] for d in cur.description]
+        while True:
+            rows = cur.fetchmany(chunksize)
+            if not rows:
+                break
+            yield from rows
+
+
+def load_versioned(table, db_path=DB_FILE, copy=True):
+    """(테이블 버전, DataFrame) 반환 — 버전과 데이터는 같은 시점의 것 (copy 는 load_all 과 같음)"""
+    versions, result = _load(db_path, [table], copy)
+    return versions.get(table), result[table]
+
+
+# -------------------------
+# 행 단위 쓰기
+# -------------------------
+def _select_rows(conn, table, where, params):
+    cur = conn.execute(f"SELECT rowid, * FROM {_quote(table)} WHERE {where}", params)
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, values)) for values in cur]
+
+
+def get_row(table, key_value, db_path=DB_FILE):
+    """키로 행 하나를 DB 에서 바로 읽기 (없으면 None, 캐시를 거치지 않음)"""
+    with closing(connect(db_path)) as conn:
+        rows = _select_rows(conn, table, f"{_quote(TABLES[table])} = ?", [_to_sql(TABLES[table], key_value)])
+    _count_io("read")
+    return rows[0] if rows else None
+
+
+def _check_rev(conn, table, key_value, expected_rev):
+    """행 버전이 expected_rev 와 다르거나 행이 없으면 ConflictError"""
+    key = TABLES[table]
+    revs = [r[0] for r in conn.execute(
+        f"SELECT {_quote(REV_COLUMN)} FROM {_quote(table)} WHERE {_quote(key)} = ?",
+        [_to_sql(key, key_value)],
+    )]
+    if not revs:
+        raise ConflictError(f"다른 사용자가 이미 삭제한 행입니다: {key_value}")
+    if any(rev != expected_rev for rev in revs):
+        raise ConflictError(f"다른 사용자가 먼저 수정한 행입니다: {key_value}")
+
+
+def _finish_write(db_path, table, changes, version):
+    if changes:
+        _count_io("write")
+        _notify(db_path, table, changes, version)
+    else:
+        _count_io("skip")
+    return len(changes)
+
+
+def insert_row(table, row, db_path=DB_FILE):
+    with transaction(db_path) as conn:
+        columns = [c for c in table_columns(conn, table) if c in row]
+        placeholders = ", ".join("?" for _ in columns)
+        cur = conn.execute(
+            f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) VALUES ({placeholders})",
+            [_to_sql(c, row[c]) for c in columns],
+        )
+        new_row = _select_rows(conn, table, "rowid = ?", (cur.lastrowid,))[0]
+        version = _bump_version(conn, table)
+    return _finish_write(db_path, table, [(None, new_row)], version)
+
+
+def insert_rows(table, df, db_path=DB_FILE):
+    """여러 행을 하나의 트랜잭션으로 추가 (추가한 행 수 반환)
+
+    대량 입력은 집계를 증분 갱신하는 것보다 다시 만드는 편이 빠르므로
+    BULK_NOTIFY_LIMIT 보다 많으면 변경 목록 대신 None(전체 교체)으로 알림
+    """
+    if df.empty:
+        _count_io("skip")
+        return 0
+    with transaction(db_path) as conn:
+        columns = [c for c in df.columns if c in table_columns(conn, table)]
+        last = conn.execute(f"SELECT MAX(rowid) FROM {_quote(table)}").fetchone()[0] or 0
+        _insert_frame(conn, table, df[columns])
+        changes = None
+        if len(df) <= BULK_NOTIFY_LIMIT:
+            changes = [(None, row) for row in _select_rows(conn, table, "rowid > ?", (last,))]
+        version = _bump_version(conn, table)
+    _count_io("write")
+    _notify(db_path, table, changes, version)
+    return len(df)
+
+
+def update_row(table, key_value, values, db_path=DB_FILE, expected_rev=None):
+    """값이 실제로 바뀐 경우에만 갱신 (갱신된 행 수 반환)
+
+    expected_rev 가 주어지면 읽어 둔 행 버전과 현재 버전이 같을 때만 갱신하고,
+    그 사이 다른 세션이 수정/삭제했으면 ConflictError (덮어쓰기 방지)
+    """
+    key = TABLES[table]
+    version = None
+    with transaction(db_path) as conn:
+        all_columns = table_columns(conn, table)
+        if expected_rev is not None:
+            _check_rev(conn, table, key_value, expected_rev)
+        columns = [c for c in all_columns if c in values and c != REV_COLUMN]
+        new_values = [_to_sql(c, values[c]) for c in columns]
+        assignments = [f"{_quote(c)} = ?" for c in columns]
+        if REV_COLUMN in all_columns:
+            assignments.append(f"{_quote(REV_COLUMN)} = {_quote(REV_COLUMN)} + 1")
+        # 변경 여부 확인: 모든 컬럼 값이 같으면 쓰지 않음
+        changed = " OR ".join(f"{_quote(c)} IS NOT ?" for c in columns)
+        old_rows = _select_rows(
+            conn, table, f"{_quote(key)} = ? AND ({changed})",
+            [_to_sql(key, key_value)] + new_values,
+        )
+        changes = []
+        for old in old_rows:
+            conn.execute(
+                f"UPDATE {_quote(table)} SET {', '.join(assignments)} WHERE rowid = ?",
+                new_values + [old["rowid"]],
+            )
+            changes.append((old, _select_rows(conn, table, "rowid = ?", (old["rowid"],))[0]))
+        if changes:
+            version = _bump_version(conn, table)
+    return _finish_write(db_path, table, changes, version)
+
+
+def delete_row(table, key_value, db_path=DB_FILE, expected_rev=None):
+    """행 삭제 (expected_rev 는 update_row 와 같음)"""
+    key = TABLES[table]
+    version = None
+    with transaction(db_path) as conn:
+        if expected_rev is not None:
+            _check_rev(conn, table, key_value, expected_rev)
+        old_rows = _select_rows(conn, table, f"{_quote(key)} = ?", [_to_sql(key, key_value)])
+        conn.executemany(
+            f"DELETE FROM {_quote(table)} WHERE rowid = ?",
+            [(old["rowid"],) for old in old_rows],
+        )
+        changes = [(old, None) for old in old_rows]
+        if changes:
+            version = _bump_version(conn, table)
+    return _finish_write(db_path, table, changes, version)
+
+
+# -------------------------
+# 변경 저널 기록 / 압축
+# - 커밋된 모든 쓰기를 저널에 기록 (다른 변경 알림보다 먼저 등록)
+# - 저널이 JOURNAL_COMPACT_BYTES 를 넘으면 백그라운드에서 압축
+#   (현재 저널을 구간 파일로 넘기고 → 모든 테이블 스냅샷 저장 → 구간 파일 보관)
+# -------------------------
+_compacting = threading.Lock()
+
+
+def compact_journal(db_path=DB_FILE):
+    """저널 압축 (이미 다른 스레드가 압축 중이면 False)"""
+    if not _compacting.acquire(blocking=False):
+        return False
+    try:
+        segment = journal.rotate(db_path)
+        if segment is None:
+            return False
+        versions, data = _load(db_path, TABLES)
+        with closing(connect(db_path)) as conn:
+            db_id = _db_id(conn)
+        # pyarrow 가 없으면 스냅샷 없이 보관만 함 (이후 콜드 스타트는 SQLite 에서 읽음)
+        if db_id is not None:
+            for table, df in data.items():
+                write_snapshot(table, df, db_id, versions[table], db_path)
+        journal.archive(segment)
+        return True
+    finally:
+        _compacting.release()
+
+
+def recent_changes(limit=50, db_path=DB_FILE):
+    """저널의 최근 변경 DataFrame [ts, table, op, version, keys] (최근 것부터, 압축 이후분)"""
+    rows = []
+    for entry in journal.entries(db_path)[-limit:][::-1]:
+        changes = entry["changes"]
+        key = TABLES.get(entry["table"])
+        keys = "" if changes is None else ", ".join(
+            str((new or old).get(key)) for old, new in changes[:3]
+        ) + (" …" if len(changes) > 3 else "")
+        rows.append((entry["ts"], entry["table"], entry["op"], entry["version"], keys))
+    return pd.DataFrame(rows, columns=["ts", "table", "op", "version", "keys"])
+
+
+def _record_change(db_path, table, changes, version):
+    journal.append(db_path, table, version, changes)
+    if journal.size(db_path) > JOURNAL_COMPACT_BYTES and not _compacting.locked():
+        threading.Thread(target=compact_journal, args=(db_path,), daemon=True).start()
+
+
+add_listener(_record_change)
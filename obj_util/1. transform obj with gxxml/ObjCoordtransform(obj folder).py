@@ -1,13 +1,45 @@
+import argparse
 import os
+import sqlite3
+import re
+import sys
+import time
 import numpy as np
 import xml.etree.ElementTree as ET
-import tkinter as tk
-from tkinter import filedialog
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gxxmlparser import GXXMLCache, model_matrices, transform_points        # obj_util/gxxmlparser.py
 
 # ----------------- 공통 유틸 -----------------
+GXXML_KEYS = ['tx','ty','tz','rx','ry','rz','sx','sy','sz',
+              'forwardx','forwardy','forwardz','upx','upy','upz','x','y','z']   # gxxmlparser.BATCH_COLUMNS 순서
+
+_gxxml_cache = None
+def gxxml_cache():
+    """파싱 결과 캐시 (경로+수정시각+크기가 같으면 XML 을 다시 읽지 않음, 쓸 수 없으면 None)
+
+    strict: Transform 속성이 빠진 파일은 기본값으로 채우지 않고 아래 속성 찾기로 넘김
+    """
+    global _gxxml_cache
+    if _gxxml_cache is None:
+        try: _gxxml_cache = GXXMLCache(strict=True)
+        except (OSError, sqlite3.Error) as e: disable_gxxml_cache(e)
+    return _gxxml_cache or None
+
+def disable_gxxml_cache(error):
+    """캐시 파일을 만들 수 없거나 잠김/손상 → 이후로는 캐시 없이 XML 을 직접 읽음"""
+    global _gxxml_cache
+    print(f"[gxxml 캐시] 사용 안 함: {error}")
+    _gxxml_cache = False
+
 def extract_transform_values_from_gxxml(path):
-    keys = ['tx','ty','tz','rx','ry','rz','sx','sy','sz',
-            'forwardx','forwardy','forwardz','upx','upy','upz','x','y','z']
+    cache = gxxml_cache()
+    if cache is not None:                  # GIX/SceneNode 구조면 캐시에서
+        try: return dict(zip(GXXML_KEYS, cache.values(path).tolist()))
+        except (ValueError, FileNotFoundError): pass    # 구조가 다르거나 Transform 속성이 빠짐 → 전체 요소에서 속성 찾기
+        except (OSError, sqlite3.Error) as e: disable_gxxml_cache(e)
+    keys = GXXML_KEYS
     vals = {k:None for k in keys}
 
     root = ET.parse(path).getroot()
@@ -26,36 +58,194 @@ def euler_zyx(rx, ry, rz):
                      [ so*sp*ck+co*sk,  -so*sp*sk+co*ck, -so*cp ],
                      [-co*sp*ck+so*sk,   co*sp*sk+so*ck,  co*cp ]])
     
-def transform_obj(obj_path, gxxml_path, output_path):
+# ----------------- OBJ 일괄 변환 -----------------
+# 연속된 v 줄 / vn 줄 묶음 (그 사이의 다른 줄은 그대로 복사)
+GEOMETRY_BLOCK = re.compile(r'(?:^v [^\n]*(?:\n|\Z))+|(?:^vn [^\n]*(?:\n|\Z))+', re.M)
+FORMAT_ROWS = 65536                         # 한 번에 문자열로 만드는 줄 수
+CHUNK_BYTES = 4 * 1024 * 1024              # 한 번에 읽어 변환하는 크기 (줄 단위로 끊음, 메모리 사용량 상한)
+WRITE_BUFFER = 16 * 1024 * 1024             # 출력 버퍼 크기
+
+def parse_block(block, prefix):
+    """prefix('v ' / 'vn ') 줄 묶음 → (N,3) 좌표 배열, 줄별 4번째 이후 값(없으면 None)"""
+    lines = block.count('\n') + (not block.endswith('\n'))
+    values = np.fromstring(block.replace(prefix, ' '), sep=' ')
+    if values.size == lines * 3:
+        return values.reshape(lines, 3), None
+    # 값 개수가 3개가 아닌 줄이 있으면(정점 색 등) 줄마다 나눔
+    rows = [line.split()[1:] for line in block.splitlines()]
+    xyz = np.array([row[:3] for row in rows], dtype=np.float64)
+    return xyz, [' ' + ' '.join(row[3:]) if len(row) > 3 else '' for row in rows]
+
+def format_block(prefix, xyz, extras=None):
+    """(N,3) 좌표 → 'prefix x y z\n' 줄들 (소수 6자리)"""
+    if extras is not None:
+        return ''.join(f"{prefix}{x:.6f} {y:.6f} {z:.6f}{e}\n" for (x, y, z), e in zip(xyz.tolist(), extras))
+    fmt = prefix + '%.6f %.6f %.6f\n'
+    # 줄마다 f-string 을 만드는 대신 여러 줄을 한 번의 % 포맷으로
+    return ''.join((fmt * len(part)) % tuple(part.ravel().tolist())
+                   for part in (xyz[i:i + FORMAT_ROWS] for i in range(0, len(xyz), FORMAT_ROWS)))
+
+def transform_obj_text(text, M, R):
+    """OBJ 문자열을 변환한 조각들을 순서대로 반환 ((출력 문자열, 정점 수))
+
+    M: 4x4 모델 행렬 (정점), R: 3x3 회전행렬 (법선, 회전만 적용)
+    """
+    pos = 0
+    for match in GEOMETRY_BLOCK.finditer(text):
+        if match.start() > pos:
+            yield text[pos:match.start()], 0
+        block = match.group()
+        if block.startswith('vn '):
+            xyz, extras = parse_block(block, 'vn ')
+            yield format_block('vn ', xyz @ R.T, extras), 0
+        else:
+            xyz, extras = parse_block(block, 'v ')
+            yield format_block('v  ', transform_points(M, xyz), extras), len(xyz)
+        pos = match.end()
+    if pos < len(text):
+        yield text[pos:], 0
+
+def transform_matrices(m):
+    """extract_transform_values_from_gxxml 결과 → (4x4 모델 행렬, 3x3 회전행렬)"""
+    M = model_matrices([m['tx'], m['ty'], m['tz']], [m['rx'], m['ry'], m['rz']], [m['sx'], m['sy'], m['sz']])
+    return M, euler_zyx(m['rx'], m['ry'], m['rz'])
+
+def read_chunks(fi, chunk_bytes=CHUNK_BYTES):
+    """약 chunk_bytes 크기씩 줄 단위로 끊어 읽음 (마지막 줄이 잘리지 않게 줄 끝까지 더 읽음)"""
+    while True:
+        chunk = fi.read(chunk_bytes)
+        if not chunk: return
+        if not chunk.endswith('\n'): chunk += fi.readline()
+        yield chunk
+
+def transform_obj(obj_path, gxxml_path, output_path, chunk_bytes=CHUNK_BYTES, verbose=True):
+    """정점/법선을 청크 단위로 읽어 묶음 변환 후 바로 기록 (정점 수 반환, 실패 시 None)
+
+    파일 크기와 상관없이 메모리는 청크 크기만큼만 사용 (verbose=False 면 진행률/완료 출력 생략)
+    """
     if not (gxxml_path and obj_path and output_path): return print("필수 경로가 누락됐습니다.")
 
     m = extract_transform_values_from_gxxml(gxxml_path)
     if any(m[k] is None for k in ['sx','sy','sz','rx','ry','rz','tx','ty','tz']):
         return print("gxxml에서 변환정보를 읽을 수 없습니다.")
+    M, R = transform_matrices(m)
 
-    S = np.array([m['sx'], m['sy'], m['sz']])
-    T = np.array([m['tx'], m['ty'], m['tz']])
-    R = euler_zyx(m['rx'], m['ry'], m['rz'])
-    
-    def transform(v):           # v: (3,) numpy array
-        return (R @ (v * S)) + T
-    
-    with open(obj_path) as fi, open(output_path,'w') as fo:
-        for line in fi:
-            if   line.startswith('v '):      # vertex
-                v = np.fromstring(line[2:], sep=' ')
-                v2 = transform(v)
-                fo.write(f"v  {v2[0]:.6f} {v2[1]:.6f} {v2[2]:.6f}\n")
-            elif line.startswith('vn '):     # normal
-                n = np.fromstring(line[3:], sep=' ')
-                n2 = R @ n                   # 회전만 적용
-                fo.write(f"vn {n2[0]:.6f} {n2[1]:.6f} {n2[2]:.6f}\n")
-            else:
-                fo.write(line)
+    start = time.perf_counter()
+    vertices = 0
+    total = os.path.getsize(obj_path)
+    # 같은 폴더의 임시 파일에 다 쓴 뒤 교체 (중단되면 출력이 바뀌지 않아 다음 실행에서 다시 변환됨)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(obj_path) as fi, open(tmp_path, 'w', buffering=WRITE_BUFFER) as fo:
+            for chunk in read_chunks(fi, chunk_bytes):
+                pieces = []
+                for piece, count in transform_obj_text(chunk, M, R):
+                    pieces.append(piece)
+                    vertices += count
+                fo.write(''.join(pieces))
+                if verbose:
+                    done = min(fi.buffer.tell(), total)     # 디스크에서 읽은 바이트
+                    print(f"\r  {os.path.basename(obj_path)}: {done:,} / {total:,} bytes ({done / max(total, 1):.0%})", end='', flush=True)
+        os.replace(tmp_path, output_path)
+    except BaseException:                   # Ctrl+C 포함
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+    seconds = time.perf_counter() - start
+    if not verbose: return vertices
+    print()
+    mb = total / 1e6
     print("변환 완료 →", output_path)
-    print(f"[완료] {os.path.basename(output_path)} 저장됨")
+    print(f"[완료] {os.path.basename(output_path)} 저장됨 "
+          f"(정점 {vertices:,}개, {mb:.1f} MB, {mb / max(seconds, 1e-9):.1f} MB/s)")
+    return vertices
+
+# ----------------- 폴더 일괄 변환 -----------------
+def find_obj_pairs(folder_path):
+    """폴더의 (obj, gxxml, 출력 obj) 목록 (큰 obj 부터, gxxml 이 없는 obj 는 안내 후 제외)"""
+    pairs = []
+    for file in os.listdir(folder_path):
+        if not file.lower().endswith(".obj"): continue
+        base_name = os.path.splitext(file)[0]
+        gxxml_path = os.path.join(folder_path, base_name + ".gxxml")
+        if os.path.exists(gxxml_path):
+            pairs.append((os.path.join(folder_path, file), gxxml_path,
+                          os.path.join(folder_path, base_name + "_Transformed.obj")))
+        elif not base_name.endswith("_Transformed"):
+            print(f"[스킵] {file}: {base_name}.gxxml 없음")
+    # 큰 파일을 먼저 보내 마지막에 큰 파일 하나만 남아 오래 걸리는 일을 줄임
+    pairs.sort(key=lambda pair: os.path.getsize(pair[0]), reverse=True)
+    return pairs
+
+def is_up_to_date(obj_path, gxxml_path, output_path):
+    """출력 obj 가 obj/gxxml 보다 나중에 만들어졌으면 True"""
+    try:
+        return os.path.getmtime(output_path) > max(os.path.getmtime(obj_path), os.path.getmtime(gxxml_path))
+    except OSError:
+        return False
+
+def _transform_pair(pair):
+    """프로세스 풀 작업: (obj 경로, 정점 수, 걸린 시간, 오류 메시지)"""
+    obj_path, gxxml_path, output_path = pair
+    start = time.perf_counter()
+    try:
+        vertices = transform_obj(obj_path, gxxml_path, output_path, verbose=False)
+        error = None if vertices is not None else "gxxml에서 변환정보를 읽을 수 없습니다."
+    except Exception as e:
+        vertices, error = None, f"{type(e).__name__}: {e}"
+    return obj_path, vertices or 0, time.perf_counter() - start, error
+
+def transform_folder(folder_path, workers=None, force=False):
+    """폴더의 obj/gxxml 쌍을 프로세스 풀로 변환 (workers=1 이면 현재 프로세스에서)
+
+    force=False 면 출력이 입력보다 새로운 쌍은 건너뜀. 요약 dict 반환
+    """
+    start = time.perf_counter()
+    pairs = find_obj_pairs(folder_path)
+    todo = pairs if force else [pair for pair in pairs if not is_up_to_date(*pair)]
+    summary = {'files': 0, 'skipped': len(pairs) - len(todo), 'failed': 0, 'vertices': 0, 'bytes': 0}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(todo)))
+
+    def record(result):
+        obj_path, vertices, seconds, error = result
+        if error is not None:
+            summary['failed'] += 1
+            return print(f"[오류] {os.path.basename(obj_path)}: {error}")
+        summary['files'] += 1
+        summary['vertices'] += vertices
+        summary['bytes'] += os.path.getsize(obj_path)
+        print(f"[완료] {os.path.basename(obj_path)} (정점 {vertices:,}개, {seconds:.2f}s)")
+
+    if workers == 1:
+        for pair in todo: record(_transform_pair(pair))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # 큰 파일 순서대로 제출 → 먼저 비는 프로세스가 다음으로 큰 파일을 받음
+            for future in as_completed([pool.submit(_transform_pair, pair) for pair in todo]):
+                record(future.result())
+
+    summary['seconds'] = time.perf_counter() - start
+    mb = summary['bytes'] / 1e6
+    print(f"[요약] 파일 {summary['files']}개 변환 · 건너뜀 {summary['skipped']} · 오류 {summary['failed']} · "
+          f"정점 {summary['vertices']:,}개 · {summary['seconds']:.2f}s "
+          f"({mb:.1f} MB, {mb / max(summary['seconds'], 1e-9):.1f} MB/s, workers {workers})")
+    return summary
+
+def batch_main(argv=None):
+    """명령행 변환 (tkinter 없이): python "ObjCoordtransform(obj folder).py" <폴더> [--workers N] [--force]"""
+    parser = argparse.ArgumentParser(description="폴더의 obj 파일을 같은 이름의 gxxml 로 좌표 변환")
+    parser.add_argument('folder', help="obj/gxxml 파일이 있는 폴더")
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--force', action='store_true', help="출력이 입력보다 새로워도 다시 변환")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.folder):
+        parser.error(f"폴더가 아닙니다: {args.folder}")
+    transform_folder(args.folder, args.workers, args.force)
 
 def main():
+    import tkinter as tk
+    from tkinter import filedialog
     root = tk.Tk()
     root.withdraw()
     folder_path = filedialog.askdirectory(title="변환할 obj 파일들이 있는 폴더를 선택하세요")
@@ -64,16 +254,13 @@ def main():
         print("폴더를 선택하지 않았습니다.")
         return
 
-    for file in os.listdir(folder_path):
-        if file.lower().endswith(".obj"):
-            obj_path = os.path.join(folder_path, file)
-            base_name = os.path.splitext(file)[0]
-            gxxml_path = os.path.join(folder_path, base_name + ".gxxml")
-            if os.path.exists(gxxml_path):
-                output_path = os.path.join(folder_path, base_name + "_Transformed.obj")
-                transform_obj(obj_path, gxxml_path, output_path)
-            else:
-                print(f"[스킵] {file}: {base_name}.gxxml 없음")
+    transform_folder(folder_path, workers=1, force=True)
+
+    if _gxxml_cache:
+        print(f"[gxxml 캐시] 적중 {_gxxml_cache.hits} · 미스 {_gxxml_cache.misses}")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        batch_main()
+    else:
+        main()
@@ -1,12 +1,43 @@
+import os
+import sqlite3
+import sys
 import numpy as np
 import tkinter as tk
 from tkinter import filedialog
 import xml.etree.ElementTree as ET
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gxxmlparser import GXXMLCache        # obj_util/gxxmlparser.py
+
 # ----------------- 공통 유틸 -----------------
+GXXML_KEYS = ['tx','ty','tz','rx','ry','rz','sx','sy','sz',
+              'forwardx','forwardy','forwardz','upx','upy','upz','x','y','z']   # gxxmlparser.BATCH_COLUMNS 순서
+
+_gxxml_cache = None
+def gxxml_cache():
+    """파싱 결과 캐시 (경로+수정시각+크기가 같으면 XML 을 다시 읽지 않음, 쓸 수 없으면 None)
+
+    strict: Transform 속성이 빠진 파일은 기본값으로 채우지 않고 아래 속성 찾기로 넘김
+    """
+    global _gxxml_cache
+    if _gxxml_cache is None:
+        try: _gxxml_cache = GXXMLCache(strict=True)
+        except (OSError, sqlite3.Error) as e: disable_gxxml_cache(e)
+    return _gxxml_cache or None
+
+def disable_gxxml_cache(error):
+    """캐시 파일을 만들 수 없거나 잠김/손상 → 이후로는 캐시 없이 XML 을 직접 읽음"""
+    global _gxxml_cache
+    print(f"[gxxml 캐시] 사용 안 함: {error}")
+    _gxxml_cache = False
+
 def extract_transform_values_from_gxxml(path):
-    keys = ['tx','ty','tz','rx','ry','rz','sx','sy','sz',
-            'forwardx','forwardy','forwardz','upx','upy','upz','x','y','z']
+    cache = gxxml_cache()
+    if cache is not None:                  # GIX/SceneNode 구조면 캐시에서
+        try: return dict(zip(GXXML_KEYS, cache.values(path).tolist()))
+        except (ValueError, FileNotFoundError): pass    # 구조가 다르거나 Transform 속성이 빠짐 → 전체 요소에서 속성 찾기
+        except (OSError, sqlite3.Error) as e: disable_gxxml_cache(e)
+    keys = GXXML_KEYS
     vals = {k:None for k in keys}
 
     root = ET.parse(path).getroot()
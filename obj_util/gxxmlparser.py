@@ -1,7 +1,19 @@
+import argparse
+import glob
+import hashlib
+import io
 import os
+import sqlite3
+import sys
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
 
 @dataclass
 class Transform:
@@ -34,27 +46,108 @@ class ModelCenter:
     y: float
     z: float
 
+def rotation_matrices(rx, ry, rz) -> np.ndarray:
+    """X-Y-Z 회전각(도) → 회전행렬 R = Rx @ Ry @ Rz (배열을 주면 (..., 3, 3))
+
+    ObjCoordtransform 의 euler_zyx 와 같은 행렬
+    """
+    o, p, k = (np.deg2rad(np.asarray(a, dtype=np.float64)) for a in (rx, ry, rz))
+    co, cp, ck = np.cos(o), np.cos(p), np.cos(k)
+    so, sp, sk = np.sin(o), np.sin(p), np.sin(k)
+    R = np.empty(np.broadcast(o, p, k).shape + (3, 3), dtype=np.float64)
+    R[..., 0, 0] = cp * ck
+    R[..., 0, 1] = -cp * sk
+    R[..., 0, 2] = sp
+    R[..., 1, 0] = so * sp * ck + co * sk
+    R[..., 1, 1] = -so * sp * sk + co * ck
+    R[..., 1, 2] = -so * cp
+    R[..., 2, 0] = -co * sp * ck + so * sk
+    R[..., 2, 1] = co * sp * sk + so * ck
+    R[..., 2, 2] = co * cp
+    return R
+
+def model_matrices(t, r, s) -> np.ndarray:
+    """이동 t, 회전각(도) r, 스케일 s ((..., 3) 배열) → 4x4 모델 행렬 [R·diag(s) | t] (..., 4, 4)
+
+    점 v 는 M @ [v, 1] = R @ (v * s) + t 로 변환됨
+    """
+    t, r, s = (np.asarray(a, dtype=np.float64) for a in (t, r, s))
+    R = rotation_matrices(r[..., 0], r[..., 1], r[..., 2])
+    M = np.zeros(R.shape[:-2] + (4, 4), dtype=np.float64)
+    M[..., :3, :3] = R * s[..., None, :]
+    M[..., :3, 3] = t
+    M[..., 3, 3] = 1.0
+    return M
+
+def normal_matrices(M) -> np.ndarray:
+    """4x4 모델 행렬 (..., 4, 4) → 법선 행렬 (..., 3, 3) (왼쪽 위 3x3 의 역행렬의 전치)"""
+    return np.swapaxes(np.linalg.inv(np.asarray(M, dtype=np.float64)[..., :3, :3]), -1, -2)
+
+def transform_points(M, points) -> np.ndarray:
+    """(N, 3) 점 배열에 4x4 행렬 M 을 한 번의 행렬곱으로 적용"""
+    M = np.asarray(M, dtype=np.float64)
+    return np.asarray(points, dtype=np.float64) @ M[:3, :3].T + M[:3, 3]
+
 @dataclass
 class SceneNode:
-    """장면 노드 정보를 저장하는 데이터 클래스"""
+    """장면 노드 정보를 저장하는 데이터 클래스
+
+    행렬은 처음 사용할 때 계산해 보관 (transform 값을 바꾼 뒤에는 새 SceneNode 를 만들 것)
+    """
     transform: Transform
     front: Front
     model_center: ModelCenter
 
+    @cached_property
+    def rotation_matrix(self) -> np.ndarray:
+        """3x3 회전행렬 (float64)"""
+        t = self.transform
+        return rotation_matrices(t.rx, t.ry, t.rz)
+
+    @cached_property
+    def model_matrix(self) -> np.ndarray:
+        """4x4 모델 행렬 (float64, 스케일 → 회전 → 이동)"""
+        t = self.transform
+        return model_matrices((t.tx, t.ty, t.tz), (t.rx, t.ry, t.rz), (t.sx, t.sy, t.sz))
+
+    @cached_property
+    def normal_matrix(self) -> np.ndarray:
+        """3x3 법선 행렬 (float64, 스케일이 균일하지 않아도 법선이 면에 수직으로 유지됨)"""
+        return normal_matrices(self.model_matrix)
+
 @dataclass
 class GXXMLData:
     """전체 GXXML 데이터를 저장하는 데이터 클래스"""
     product: str
     scene_node: SceneNode
 
+TRANSFORM_ATTRIBUTES = ('tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz')
+
 class GXXMLParser:
-    """GXXML 파일을 파싱하는 클래스"""
+    """GXXML 파일을 파싱하는 클래스 (cache 를 주면 parse_file 결과를 GXXMLCache 에서 재사용)
+
+    strict=True 면 이동/회전/축척 값이 모호하지 않은 문서만 파싱 (아니면 기본값 대신 ValueError)
+    - GIX/SceneNode 가 하나이고, tx..sz 속성을 가진 요소가 그 Transform 하나뿐이며, 9개 속성이 모두 있음
+    """
     
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional['GXXMLCache'] = None, strict: bool = False):
+        self.cache = cache
+        self.strict = strict
     
+    def check_strict(self, root):
+        """strict 조건 확인 (SceneNode 가 여러 개이거나 다른 요소에도 tx..sz 가 있으면 ValueError)"""
+        if len(root.findall('GIX/SceneNode')) != 1:
+            raise ValueError("SceneNode 가 여러 개입니다")
+        owners = [e for e in root.iter() if any(k in e.attrib for k in TRANSFORM_ATTRIBUTES)]
+        if owners != [root.find('GIX/SceneNode/Transform')]:
+            raise ValueError("Transform 속성이 SceneNode/Transform 밖에도 있습니다")
+
     def parse_transform(self, transform_element) -> Transform:
         """Transform 요소를 파싱"""
+        if self.strict:
+            missing = [k for k in TRANSFORM_ATTRIBUTES if transform_element.get(k) is None]
+            if missing:
+                raise ValueError(f"Transform 속성이 누락되었습니다: {', '.join(missing)}")
         return Transform(
             tx=float(transform_element.get('tx', 0)),
             ty=float(transform_element.get('ty', 0)),
@@ -104,6 +197,8 @@ class GXXMLParser:
     
     def parse_file(self, file_path: str) -> GXXMLData:
         """GXXML 파일을 파싱하여 데이터 구조체로 반환"""
+        if self.cache is not None:
+            return self.cache.parse_file(file_path)
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
         
@@ -124,6 +219,8 @@ class GXXMLParser:
             if scene_node_element is None:
                 raise ValueError("SceneNode 요소를 찾을 수 없습니다")
             
+            if self.strict:
+                self.check_strict(root)
             scene_node = self.parse_scene_node(scene_node_element)
             
             return GXXMLData(
@@ -152,6 +249,8 @@ class GXXMLParser:
             if scene_node_element is None:
                 raise ValueError("SceneNode 요소를 찾을 수 없습니다")
             
+            if self.strict:
+                self.check_strict(root)
             scene_node = self.parse_scene_node(scene_node_element)
             
             return GXXMLData(
@@ -162,6 +261,347 @@ class GXXMLParser:
         except ET.ParseError as e:
             raise ValueError(f"XML 파싱 오류: {e}")
 
+# 일괄 파싱 결과의 숫자 컬럼 (Transform, Front, ModelCenter 순서)
+BATCH_COLUMNS = [
+    'tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz',
+    'forward_x', 'forward_y', 'forward_z', 'up_x', 'up_y', 'up_z',
+    'center_x', 'center_y', 'center_z',
+]
+
+@dataclass
+class GXXMLBatch:
+    """여러 GXXML 파일의 파싱 결과 (성공한 파일은 열 단위 배열, 실패한 파일은 오류 메시지)"""
+    paths: List[str]
+    products: List[str]
+    srids: List[str]
+    values: np.ndarray                      # (파일 수, len(BATCH_COLUMNS)) float64
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def column(self, name: str) -> np.ndarray:
+        """BATCH_COLUMNS 중 한 컬럼 배열"""
+        return self.values[:, BATCH_COLUMNS.index(name)]
+
+    def model_matrices(self) -> np.ndarray:
+        """파일별 4x4 모델 행렬 (N, 4, 4)"""
+        v = self.values
+        return model_matrices(v[:, 0:3], v[:, 3:6], v[:, 6:9])
+
+    def normal_matrices(self) -> np.ndarray:
+        """파일별 3x3 법선 행렬 (N, 3, 3)"""
+        return normal_matrices(self.model_matrices())
+
+    def rotation_matrices(self) -> np.ndarray:
+        """파일별 3x3 회전행렬 (N, 3, 3)"""
+        v = self.values
+        return rotation_matrices(v[:, 3], v[:, 4], v[:, 5])
+
+    def to_dataframe(self):
+        """pandas DataFrame [path, product, srid, tx .. center_z]"""
+        import pandas as pd
+
+        df = pd.DataFrame(self.values, columns=BATCH_COLUMNS)
+        df.insert(0, 'srid', self.srids)
+        df.insert(0, 'product', self.products)
+        df.insert(0, 'path', self.paths)
+        return df
+
+def scene_node_values(node: SceneNode) -> tuple:
+    """SceneNode 의 숫자 값을 BATCH_COLUMNS 순서의 튜플로 변환"""
+    t, f, c = node.transform, node.front, node.model_center
+    return (t.tx, t.ty, t.tz, t.rx, t.ry, t.rz, t.sx, t.sy, t.sz,
+            f.forward_x, f.forward_y, f.forward_z, f.up_x, f.up_y, f.up_z,
+            c.x, c.y, c.z)
+
+def scene_node_from_values(values, srid: str = '') -> SceneNode:
+    """BATCH_COLUMNS 순서의 값으로 SceneNode 생성 (scene_node_values 의 반대)"""
+    v = [float(x) for x in values]
+    return SceneNode(
+        transform=Transform(*v[0:9], srid=srid),
+        front=Front(*v[9:15]),
+        model_center=ModelCenter(*v[15:18]),
+    )
+
+def find_gxxml_files(source: Union[str, Iterable[str]], recursive: bool = True) -> List[str]:
+    """폴더(하위 폴더 포함), glob 패턴 또는 경로 목록에서 .gxxml 파일 목록 (정렬)"""
+    if not isinstance(source, str):
+        return list(source)
+    if os.path.isdir(source):
+        pattern = os.path.join(source, '**', '*.gxxml') if recursive else os.path.join(source, '*.gxxml')
+        return sorted(glob.glob(pattern, recursive=recursive))
+    return sorted(glob.glob(source, recursive=recursive))
+
+_worker_parsers = {False: GXXMLParser(), True: GXXMLParser(strict=True)}
+
+def _parse_for_batch(path: str, strict: bool = False):
+    """(path, product, srid, 값 튜플, 오류 메시지) - 예외는 메시지로 돌려줌"""
+    try:
+        data = _worker_parsers[strict].parse_file(path)
+        return path, data.product, data.scene_node.transform.srid, scene_node_values(data.scene_node), None
+    except Exception as e:
+        return path, None, None, None, f"{type(e).__name__}: {e}"
+
+def parse_files(paths: List[str], workers: Optional[int] = None, strict: bool = False) -> GXXMLBatch:
+    """파일 목록을 프로세스 풀로 파싱 (workers=1 이면 현재 프로세스에서, 입력 순서 유지)
+
+    결과의 paths/errors 는 절대 경로 (GXXMLCache.parse_files 와 같은 키)
+    """
+    paths = [os.path.abspath(p) for p in paths]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    if workers == 1:
+        results = map(_parse_for_batch, paths, repeat(strict))
+    else:
+        # 작은 파일이 많으므로 여러 파일을 묶어서 보내 프로세스 간 통신 횟수를 줄임
+        chunksize = max(1, len(paths) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_for_batch, paths, repeat(strict), chunksize=chunksize))
+
+    ok_paths, products, srids, rows, errors = [], [], [], [], {}
+    for path, product, srid, values, error in results:
+        if error is not None:
+            errors[path] = error
+            continue
+        ok_paths.append(path)
+        products.append(product)
+        srids.append(srid)
+        rows.append(values)
+    values = np.array(rows, dtype=np.float64).reshape(len(rows), len(BATCH_COLUMNS))
+    return GXXMLBatch(ok_paths, products, srids, values, errors)
+
+def parse_batch(source: Union[str, Iterable[str]], workers: Optional[int] = None,
+                recursive: bool = True, cache: Optional['GXXMLCache'] = None) -> GXXMLBatch:
+    """폴더 / glob 패턴 / 경로 목록의 GXXML 파일을 모두 파싱 (cache 가 있으면 바뀐 파일만 파싱)"""
+    paths = find_gxxml_files(source, recursive)
+    if cache is not None:
+        return cache.parse_files(paths, workers)
+    return parse_files(paths, workers)
+
+# 파싱 결과 캐시
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'gxxmlparser', 'cache.sqlite')
+
+class GXXMLCache:
+    """파싱한 GXXML 값을 SQLite 파일에 보관
+
+    - 파일 경로별로 수정 시각(ns)과 크기가 같으면 XML 을 다시 읽지 않음
+      (use_hash=True 면 내용 해시로 비교: 파일은 읽지만 XML 파싱은 건너뜀)
+    - 값은 BATCH_COLUMNS 순서의 float64 18개를 BLOB 으로 저장
+    - 파싱에 실패한 파일은 저장하지 않음 (다음에 다시 시도)
+    - strict=True 면 GXXMLParser(strict=True) 로 파싱하고 별도 테이블에 저장
+      (기본값으로 채운 값을 strict 사용처에 돌려주지 않음)
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_FILE, use_hash: bool = False, strict: bool = False):
+        self.db_path = db_path
+        self.use_hash = use_hash
+        self.strict = strict
+        self.table = 'gxxml_strict_v2' if strict else 'gxxml'   # strict 조건이 바뀌면 이름을 바꿔 이전 값을 쓰지 않음
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT, "
+            "product TEXT, srid TEXT, vals BLOB NOT NULL)"
+        )
+        self.conn.commit()
+        self._parser = GXXMLParser(strict=strict)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _digest(path: str) -> str:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+    def _signature(self, path: str) -> tuple:
+        """(mtime_ns, size, digest) - 없는 파일이면 FileNotFoundError"""
+        st = os.stat(path)
+        digest = self._digest(path) if self.use_hash else None
+        return st.st_mtime_ns, st.st_size, digest
+
+    def _matches(self, row, signature) -> bool:
+        if row is None:
+            return False
+        if self.use_hash:
+            return row[2] == signature[2]
+        return (row[0], row[1]) == signature[:2]
+
+    def _lookup(self, paths: List[str]) -> Dict[str, tuple]:
+        """경로 → (mtime_ns, size, digest, product, srid, vals)"""
+        rows = {}
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            query = (f"SELECT path, mtime_ns, size, digest, product, srid, vals FROM {self.table} "
+                     f"WHERE path IN ({','.join('?' * len(chunk))})")
+            for path, *row in self.conn.execute(query, chunk):
+                rows[path] = tuple(row)
+        return rows
+
+    def _store(self, entries: List[tuple]):
+        """entries: [(path, signature, product, srid, values)]"""
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(path, *signature, product, srid, np.asarray(values, dtype=np.float64).tobytes())
+                 for path, signature, product, srid, values in entries],
+            )
+
+    def parse_file(self, file_path: str) -> GXXMLData:
+        """캐시에 있으면 그대로, 없거나 파일이 바뀌었으면 파싱해서 저장"""
+        path = os.path.abspath(file_path)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+        signature = self._signature(path)
+        row = self._lookup([path]).get(path)
+        if self._matches(row, signature):
+            self.hits += 1
+            values = np.frombuffer(row[5], dtype=np.float64)
+            return GXXMLData(product=row[3], scene_node=scene_node_from_values(values, row[4]))
+        self.misses += 1
+        data = self._parser.parse_file(path)
+        self._store([(path, signature, data.product, data.scene_node.transform.srid,
+                      scene_node_values(data.scene_node))])
+        return data
+
+    def parse_files(self, paths: List[str], workers: Optional[int] = None) -> GXXMLBatch:
+        """parse_files 와 같은 결과 (캐시에 없는 파일만 프로세스 풀로 파싱)"""
+        paths = [os.path.abspath(p) for p in paths]
+        rows = self._lookup(paths)
+        found, signatures, missing, errors = {}, {}, [], {}
+        for path in paths:
+            try:
+                signatures[path] = self._signature(path)
+            except OSError as e:
+                errors[path] = f"{type(e).__name__}: {e}"
+                continue
+            row = rows.get(path)
+            if self._matches(row, signatures[path]):
+                found[path] = (row[3], row[4], np.frombuffer(row[5], dtype=np.float64))
+            else:
+                missing.append(path)
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            parsed = parse_files(missing, workers, self.strict)
+            self._store([(path, signatures[path], product, srid, values)
+                         for path, product, srid, values in zip(parsed.paths, parsed.products,
+                                                                parsed.srids, parsed.values)])
+            for path, product, srid, values in zip(parsed.paths, parsed.products, parsed.srids, parsed.values):
+                found[path] = (product, srid, values)
+            errors.update(parsed.errors)
+
+        ok = [p for p in paths if p in found]
+        values = np.array([found[p][2] for p in ok], dtype=np.float64).reshape(len(ok), len(BATCH_COLUMNS))
+        return GXXMLBatch(ok, [found[p][0] for p in ok], [found[p][1] for p in ok], values, errors)
+
+    def values(self, file_path: str) -> np.ndarray:
+        """BATCH_COLUMNS 순서의 값 배열 (parse_file 과 같은 방식으로 캐시 사용)"""
+        return np.array(scene_node_values(self.parse_file(file_path).scene_node), dtype=np.float64)
+
+    def stats(self) -> dict:
+        """{hits, misses, hit_rate, entries}"""
+        total = self.hits + self.misses
+        entries = self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries,
+        }
+
+def benchmark(source: Union[str, Iterable[str]], workers_list: Iterable[Optional[int]] = (1, None)) -> List[dict]:
+    """workers 설정별 초당 파일 수 [{workers, files, errors, seconds, files_per_sec}]"""
+    paths = find_gxxml_files(source)
+    results = []
+    for workers in workers_list:
+        start = time.perf_counter()
+        batch = parse_files(paths, workers)
+        seconds = time.perf_counter() - start
+        results.append({
+            'workers': workers or os.cpu_count(),
+            'files': len(paths),
+            'errors': len(batch.errors),
+            'seconds': seconds,
+            'files_per_sec': len(paths) / seconds if seconds > 0 else float('inf'),
+        })
+    return results
+
+def batch_main(argv=None):
+    """명령행 일괄 파싱: python gxxmlparser.py <폴더 또는 glob> [--workers N] [--csv 경로] [--bench]"""
+    parser = argparse.ArgumentParser(description="GXXML 일괄 파싱")
+    parser.add_argument('source', help="폴더(하위 폴더 포함) 또는 glob 패턴")
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--csv', help="결과를 저장할 CSV 경로")
+    parser.add_argument('--bench', action='store_true', help="1 프로세스와 --workers 의 초당 파일 수 비교")
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_FILE,
+                        help=f"파싱 결과 캐시 파일 (경로 생략 시 {DEFAULT_CACHE_FILE})")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        for r in benchmark(args.source, (1, args.workers)):
+            print(f"workers {r['workers']:>3} · 파일 {r['files']} · 오류 {r['errors']} · "
+                  f"{r['seconds']:.2f}s · {r['files_per_sec']:.0f} files/s")
+        return
+
+    cache = GXXMLCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    batch = parse_batch(args.source, args.workers, cache=cache)
+    seconds = time.perf_counter() - start
+    print(f"파싱 완료: {len(batch)}개 성공, {len(batch.errors)}개 오류, {seconds:.2f}s")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"캐시: 적중 {stats['hits']} · 미스 {stats['misses']} · 저장된 파일 {stats['entries']}")
+        cache.close()
+    for path, error in batch.errors.items():
+        print(f"  [오류] {path}: {error}")
+    if args.csv:
+        batch.to_dataframe().to_csv(args.csv, index=False)
+        print(f"저장: {args.csv}")
+
+# 스트리밍 파싱 (SceneNode 가 많은 큰 문서)
+def iter_scene_nodes(source) -> Iterator[SceneNode]:
+    """문서의 모든 SceneNode 를 순서대로 하나씩 반환 (source: 파일 경로 또는 파일 객체)
+
+    iterparse 로 읽으면서 처리한 SceneNode 요소는 트리에서 떼어 내므로
+    문서 크기와 관계없이 메모리 사용량이 일정함
+    """
+    parser = GXXMLParser()
+    stack = []  # 현재 열려 있는 요소 (부모에서 떼어 내기 위해)
+    try:
+        for event, elem in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag != 'SceneNode':
+                continue
+            node = parser.parse_scene_node(elem)
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+            yield node
+    except ET.ParseError as e:
+        raise ValueError(f"XML 파싱 오류: {e}")
+
+def iter_scene_nodes_string(xml_string: str) -> Iterator[SceneNode]:
+    """XML 문자열의 모든 SceneNode 를 순서대로 하나씩 반환"""
+    return iter_scene_nodes(io.StringIO(xml_string))
+
 def pretty_print_gxxml_data(data: GXXMLData):
     """GXXML 데이터를 보기 좋게 출력"""
     print("=== GXXML 파싱 결과 ===")
@@ -308,4 +748,8 @@ def main():
 
 # 사용 예제 및 테스트
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # 인자가 있으면 일괄 파싱, 없으면 파일 선택 대화상자
+    if len(sys.argv) > 1:
+        batch_main()
+    else:
+        main()
\ No newline at end of file